@@ -1,14 +1,27 @@
 # Configure logger
 
 import logging
+import os
 
 
+# 日志等级（可通过环境变量 MAIMBOT_LOG_LEVEL 设置，如 DEBUG/INFO/WARNING）
+log_level = logging.getLevelName(os.environ.get("MAIMBOT_LOG_LEVEL", "INFO").upper())
+if not isinstance(log_level, int):
+    log_level = logging.INFO
+
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
+logger.setLevel(log_level)
+# 不向root logger传递日志记录，避免其他handler重复格式化与输出
+logger.propagate = False
 
 console_logging_handler = logging.StreamHandler()
 console_logging_handler.setFormatter(
-    logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    logging.Formatter(
+        "%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%H:%M:%S",  # 仅输出时分秒，省去毫秒格式化
+        style="%",
+        validate=False,
+    )
 )
-console_logging_handler.setLevel(logging.DEBUG)
+console_logging_handler.setLevel(log_level)
 logger.addHandler(console_logging_handler)
@@ -1,4 +1,12 @@
 # -*- coding: utf-8 -*-
+"""
+quick_algo 构建脚本
+
+注意：Cython编译指令中关闭了边界检查（boundscheck）、负索引回绕（wraparound）
+与内存视图初始化检查（initializedcheck），并启用了C语义除法（cdivision）。
+这些指令假定.pyx源码中的索引均已保证合法（不使用负索引、不越界），
+新增或修改.pyx代码时需自行保证这一点。
+"""
 import argparse
 import os
 import logging
@@ -16,6 +24,15 @@ include_dirs = [
     "src/quick_algo/cpp",
 ]
 
+# Cython编译指令（见模块文档中的索引安全约定）
+cython_directives = {
+    "language_level": "3str",
+    "boundscheck": False,
+    "wraparound": False,
+    "cdivision": True,
+    "initializedcheck": False,
+}
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -58,78 +75,52 @@ def run_cythonize(args):
 
     cythonize(
         pyx_modules,
-        compiler_directives={"language_level": 3},
+        nthreads=os.cpu_count() or 1,  # 多个.pyx文件并行编译
+        annotate=False,
+        compiler_directives=cython_directives,
         include_path=include_dirs,
         force=args.force_cythonize,
     )
 
     logger.info("Cythonize completed successfully.")
 
+def run_command(exec_args, task_name):
+    """
+    执行子进程命令，并将其输出逐行转发至logger
+    :param exec_args: 命令参数列表
+    :param task_name: 任务名称（用于日志）
+    """
+    # 合并stdout与stderr，逐行读取，避免缓存全部输出
+    with subprocess.Popen(
+        exec_args,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as process:
+        for line in process.stdout:
+            logger.info(line.rstrip())
+        return_code = process.wait()
+
+    if return_code != 0:
+        logger.error("Error occurred while %s (exit code %d).", task_name, return_code)
+        sys.exit(1)
+    logger.info("Finished %s successfully.", task_name)
+
 def run_build_sdist(args):
     logger.info("Building distribution package...")
     # 构建源码分发包
-    exec_args=[sys.executable, "-m", "build", "--sdist"]
-    if args.compile_no_simd:
-        # 添加临时环境变量
-        os.environ["QUICK_ALGO_NO_SIMD"] = "1"
-
-    try:
-        result = subprocess.run(
-            exec_args,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=os.environ.copy()
-        )
-        logger.info("Build distribution package successfully. Output:\n%s", result.stdout)
-    except subprocess.CalledProcessError as e:
-        logger.error("Error occurred while building distribution package. Details:\n%s", e.stderr)
-        logger.error(e.stderr)
-        sys.exit(1)
+    run_command([sys.executable, "-m", "build", "--sdist"], "building distribution package")
 
 def run_build_wheel(args):
     logger.info("Building wheel distribution package...")
     # 构建wheel二进制分发包
-    exec_args = [sys.executable, "-m", "build", "--wheel"]
-    if args.compile_no_simd:
-        # 添加临时环境变量
-        os.environ["QUICK_ALGO_NO_SIMD"] = "1"
-
-    try:
-        result = subprocess.run(
-            exec_args,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=os.environ.copy()
-        )
-        logger.info("Build wheel distribution package successfully. Output:\n%s", result.stdout)
-    except subprocess.CalledProcessError as e:
-        logger.error("Error occurred while building wheel distribution package. Details:\n%s", e.stderr)
-        logger.error(e.stderr)
-        sys.exit(1)
+    run_command([sys.executable, "-m", "build", "--wheel"], "building wheel distribution package")
 
 def run_install(args):
     logger.info("Installing package...")
     # 直接安装库
-    exec_args = [sys.executable, "-m", "pip", "install", "."]
-    if args.compile_no_simd:
-        # 添加临时环境变量
-        os.environ["QUICK_ALGO_NO_SIMD"] = "1"
-
-    try:
-        result = subprocess.run(
-            exec_args,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=os.environ.copy()
-        )
-        logger.info("Install package successfully. Output:\n%s", result.stdout)
-    except subprocess.CalledProcessError as e:
-        logger.error("Error occurred while installing package. Details:\n%s", e.stderr)
-        logger.error(e.stderr)
-        sys.exit(1)
+    run_command([sys.executable, "-m", "pip", "install", "."], "installing package")
 
 
 def main(args):
@@ -176,7 +167,6 @@ if __name__ == "__main__":
     arg_parser.add_argument("--build_sdist", action="store_true", default=False, help="Build the source code distribution")
     arg_parser.add_argument("--build_wheel", action="store_true", default=False, help="Build the wheel distribution")
     arg_parser.add_argument("--install", action="store_true", default=False, help="Directly install the package")
-    arg_parser.add_argument("--compile_no_simd", action="store_true", default=False, help="Compile without SIMD optimization")
     args = arg_parser.parse_args()
 
     main(args)
\ No newline at end of file
@@ -1,21 +1,113 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 import os
+import platform
+import shlex
 import sys
-import cpuinfo
 
 from setuptools import find_packages, setup, Extension
+from setuptools.command.build_ext import build_ext
 
 platform_info = {
     "os": "Unknown",  # 操作系统
-    "avx2": False,      # 是否支持AVX2指令集
-    "neon": False,      # 是否支持ARM NEON指令集
 }
 
-build_args = {
-    "no-simd": os.getenv("QUICK_ALGO_NO_SIMD") == "1"
+# x86目标架构名称（取自plat_name/ARCHFLAGS）
+X86_ARCHS = ("x86_64", "amd64", "i386", "i686", "x86", "win32")
+
+# x86 SIMD实现的专用编译参数：(GCC/Clang, MSVC)
+# 运行时分发按 NEON < AVX2 < AVX512 的顺序选择CPU支持的最高等级
+X86_SIMD_COMPILE_ARGS = {
+    "avx2": (["-mavx2", "-mfma"], ["/arch:AVX2"]),
+    "avx512": (["-mavx512f", "-mfma"], ["/arch:AVX512"]),
 }
 
+# 通用优化编译参数：(GCC/Clang, MSVC)
+OPTIMIZE_COMPILE_ARGS = (["-O3", "-funroll-loops", "-ftree-vectorize", "-fno-math-errno"], ["/O2"])
+# 快速浮点运算参数（不保证IEEE语义，需通过环境变量 QUICK_ALGO_FAST_MATH=1 显式启用）
+FAST_MATH_COMPILE_ARGS = (["-ffast-math"], ["/fp:fast"])
+
+
+class SimdExtension(Extension):
+    """
+    支持为单个源文件指定SIMD指令集的扩展模块
+    """
+
+    def __init__(self, name, sources, simd_sources=None, **kwargs):
+        super().__init__(name, sources, **kwargs)
+        # {源文件: 指令集名称}，对应的编译参数仅作用于该源文件
+        self.simd_sources = simd_sources or {}
+
+
+class SimdBuildExt(build_ext):
+    """
+    单独编译SIMD源文件，避免SIMD编译参数泄漏至其他源文件（如Cython生成的胶水代码）
+    """
+
+    def get_target_archs(self) -> list[str]:
+        """
+        获取目标CPU架构列表（交叉编译时以目标平台而非构建机为准）
+        """
+        if sys.platform == "darwin":
+            # macOS 可通过 ARCHFLAGS 同时编译多个架构（如universal2）
+            arch_flags = os.environ.get("ARCHFLAGS", "").split()
+            archs = [arch_flags[i + 1] for i in range(len(arch_flags) - 1) if arch_flags[i] == "-arch"]
+            if archs:
+                return archs
+            if self.plat_name.endswith("universal2"):
+                return ["x86_64", "arm64"]
+        # plat_name 形如 linux-x86_64、win-amd64、win-arm64、win32、macosx-11.0-arm64
+        return [self.plat_name.rsplit("-", 1)[-1].lower()]
+
+    def get_simd_compile_args(self, isa: str) -> list[str]:
+        """
+        获取SIMD源文件的专用编译参数
+        :param isa: 指令集名称（avx2/avx512/neon）
+        :return: 编译参数列表（目标架构不支持该指令集时为空，源文件将退化为标量实现）
+        """
+        if isa not in X86_SIMD_COMPILE_ARGS:
+            # AArch64 处理器均支持NEON，无需额外的编译选项
+            return []
+
+        archs = self.get_target_archs()
+        x86_archs = [arch for arch in archs if arch in X86_ARCHS]
+        if not x86_archs:
+            return []
+
+        gcc_args, msvc_args = X86_SIMD_COMPILE_ARGS[isa]
+        if self.compiler.compiler_type == "msvc":
+            return list(msvc_args)
+        if len(archs) > 1:
+            # 多架构编译（如universal2）时仅对x86切片启用SIMD参数
+            return [arg for arch in x86_archs for flag in gcc_args for arg in ("-Xarch_" + arch, flag)]
+        return list(gcc_args)
+
+    def build_extension(self, ext):
+        simd_sources = getattr(ext, "simd_sources", {})
+        simd_objects = []
+        for source, isa in simd_sources.items():
+            flags = self.get_simd_compile_args(isa)
+            print(f"SIMD source {source}: {isa} {flags}")
+            simd_objects.extend(
+                self.compiler.compile(
+                    [source],
+                    output_dir=self.build_temp,
+                    macros=ext.define_macros,
+                    include_dirs=ext.include_dirs,
+                    debug=self.debug,
+                    extra_postargs=(ext.extra_compile_args or []) + flags,
+                    depends=ext.depends,
+                )
+            )
+
+        extra_objects = ext.extra_objects
+        ext.extra_objects = list(extra_objects or []) + simd_objects
+        try:
+            super().build_extension(ext)
+        finally:
+            ext.extra_objects = extra_objects
+
+
 # 获取平台信息
 def get_platform_info():
     # 获取操作系统信息
@@ -26,81 +118,35 @@ def get_platform_info():
     elif sys.platform.startswith("darwin"):
         platform_info["os"] = "macOS"
 
-    # 获取CPU信息
-    cpu_info = cpuinfo.get_cpu_info()
-    
-    # 检查是否为ARM架构
-    is_arm_platform = False
-    if "arch_string_raw" in cpu_info:
-        arch_raw = cpu_info["arch_string_raw"].lower()
-        is_arm_platform = any(arm_arch in arch_raw for arm_arch in ["aarch64", "arm64", "armv8", "arm"])
-    
-    # 备用检测方法
-    if not is_arm_platform and "arch" in cpu_info:
-        arch = cpu_info["arch"].lower()
-        is_arm_platform = any(arm_arch in arch for arm_arch in ["aarch64", "arm64", "armv8", "arm"])
-    
-    # 将ARM信息保存到platform_info中
-    platform_info["is_arm"] = is_arm_platform
-    
-    print(f"cpu info:{cpu_info}")
-    if "flags" in cpu_info:
-        print(f"CPU Flags: {cpu_info['flags']}")
-    print(f"Detected Platform: {'ARM' if is_arm_platform else 'x86'}")
-    
-    if not build_args["no-simd"]:
-        if is_arm_platform:
-            # ARM平台上启用NEON，明确设置AVX2为False
-            platform_info["avx2"] = False
-            
-            # AArch64 处理器均支持NEON
-            if any(arm_arch in cpu_info.get("arch_string_raw", "").lower() 
-                  for arm_arch in ["aarch64", "arm64", "armv8"]):
-                platform_info["neon"] = True
-                print("Enabled ARM NEON support (AArch64)")
-            # 对于ARMv7，需要检查flags中是否有neon标志
-            elif "neon" in cpu_info.get("flags", []):
-                platform_info["neon"] = True
-                print("Enabled ARM NEON support (ARMv7)")
-        else:
-            # 非ARM平台上检查AVX2支持
-            platform_info["neon"] = False
-            if "avx2" in cpu_info.get("flags", []):
-                platform_info["avx2"] = True
+    print(f"Detected Platform: OS={platform_info['os']}, Machine={platform.machine()}")
+
 
 # 生成构建参数
 def get_compile_and_link_args():
+    """
+    生成构建参数（SIMD源文件的专用编译参数由 SimdBuildExt 依据目标架构生成）
+    :return: 通用编译参数, 链接参数
+    """
     get_platform_info()
 
     compile_args = []
-    
-    print(f"Generating Compilation Parameters - Platform Detection: {'ARM' if platform_info['is_arm'] else 'x86'}")
-    print(f"SIMD support: AVX2={platform_info['avx2']}, NEON={platform_info['neon']}")
-
-    if platform_info["is_arm"]:
-        # 在ARM平台上只使用NEON指令集，不添加AVX2相关参数
-        if platform_info["neon"]:
-            # 对于AArch64，NEON是默认的，不需要额外的编译选项
-            # 但是我们添加宏定义，以便在代码中检测NEON支持
-            compile_args.append("-D__ARM_NEON__")
-            print("Enabled NEON support")
-    else:
-        # 非ARM平台才考虑使用AVX2
-        if platform_info["os"] == "Linux" or platform_info["os"] == "macOS":
-            if platform_info["avx2"]:
-                compile_args.append("-mavx2")
-                compile_args.append("-D__AVX2__")
-                print("Enabled AVX2 support")
-        elif platform_info["os"] == "Windows":
-            if platform_info["avx2"]:
-                compile_args.append("/arch:AVX2")
-                compile_args.append("-D__AVX2__")
-                print("Enabled AVX2 support")
-    
     link_args = []
 
+    # Windows下使用MSVC编译参数
+    is_msvc = platform_info["os"] == "Windows"
+    compile_args.extend(OPTIMIZE_COMPILE_ARGS[is_msvc])
+    if os.environ.get("QUICK_ALGO_FAST_MATH") == "1":
+        compile_args.extend(FAST_MATH_COMPILE_ARGS[is_msvc])
+
+    # 额外编译参数（如源码构建时使用 -march=native）
+    extra_cflags = os.environ.get("QUICK_ALGO_EXTRA_CFLAGS", "")
+    compile_args.extend(shlex.split(extra_cflags, posix=not is_msvc))
+
+    print(f"Compile args: {compile_args}")
+
     return compile_args, link_args
 
+
 # 获取扩展模块
 def get_ext_modules():
     compile_args, link_args = get_compile_and_link_args()
@@ -118,12 +164,20 @@ def get_ext_modules():
             extra_link_args=link_args,
             language="c++",
         ),
-        Extension(
+        SimdExtension(
             "quick_algo.pagerank",
             sources=[
                 "src/quick_algo/pagerank.cpp",
                 "src/quick_algo/cpp/pagerank_impl.cpp",
+                "src/quick_algo/cpp/pagerank_kernel_scalar.cpp",
+                "src/quick_algo/cpp/simd_dispatch.cpp",
             ],
+            simd_sources={
+                # 目标架构不支持的SIMD实现会退化为标量实现，运行时不会被选中
+                "src/quick_algo/cpp/pagerank_kernel_avx2.cpp": "avx2",
+                "src/quick_algo/cpp/pagerank_kernel_avx512.cpp": "avx512",
+                "src/quick_algo/cpp/pagerank_kernel_neon.cpp": "neon",
+            },
             include_dirs=[
                 "src/quick_algo",
             ],
@@ -137,6 +191,7 @@ def get_ext_modules():
 
 setup(
     ext_modules=get_ext_modules(),
+    cmdclass={"build_ext": SimdBuildExt},
     packages=find_packages(where="src", exclude=["tests", "*.tests", "*.tests.*", "tests.*", "*/cpp*"]),
     include_package_data=True,
-)
\ No newline at end of file
+)
@@ -1,8 +1,6 @@
 #ifndef PAGERANK_H
 #define PAGERANK_H
 
-// #define __AVX2__ // 启用AVX2优化（影响：小）
-
 #include "di_graph.hpp"
 
 class EdgeWeight
@@ -29,4 +27,9 @@ double *pagerank(
     double tol                   // 收敛阈值
 );
 
+/**
+ * @brief 获取当前使用的SIMD内核名称（"avx512"、"avx2"、"neon"或"scalar"）
+ */
+const char *pagerank_simd_backend();
+
 #endif // PAGERANK_H
\ No newline at end of file
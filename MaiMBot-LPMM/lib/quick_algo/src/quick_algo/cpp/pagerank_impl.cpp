@@ -5,10 +5,50 @@
 #include <math.h>
 
 #include "pagerank.hpp"
+#include "pagerank_kernel.hpp"
+#include "simd_dispatch.hpp"
 
-#ifdef __AVX2__
-#include <immintrin.h> // SIMD指令集头文件
-#endif
+/**
+ * @brief 选择可用的最高SIMD等级（需同时满足CPU支持与对应内核已编译）
+ */
+static SimdLevel select_kernel_level()
+{
+    SimdLevel level = detect_simd_level();
+    if (level >= SIMD_LEVEL_AVX512 && pagerank_kernel_avx512_compiled())
+        return SIMD_LEVEL_AVX512;
+    if (level >= SIMD_LEVEL_AVX2 && pagerank_kernel_avx2_compiled())
+        return SIMD_LEVEL_AVX2;
+    if (level >= SIMD_LEVEL_NEON && pagerank_kernel_neon_compiled())
+        return SIMD_LEVEL_NEON;
+    return SIMD_LEVEL_SCALAR;
+}
+
+/**
+ * @brief 获取SIMD等级对应的基础分数内核
+ */
+static pagerank_base_kernel_t get_base_kernel(SimdLevel level)
+{
+    switch (level)
+    {
+    case SIMD_LEVEL_AVX512:
+        return pagerank_base_kernel_avx512;
+    case SIMD_LEVEL_AVX2:
+        return pagerank_base_kernel_avx2;
+    case SIMD_LEVEL_NEON:
+        return pagerank_base_kernel_neon;
+    default:
+        return pagerank_base_kernel_scalar;
+    }
+}
+
+// 模块加载（import）时完成内核选择
+static const SimdLevel pagerank_kernel_level = select_kernel_level();
+static const pagerank_base_kernel_t pagerank_base_kernel = get_base_kernel(pagerank_kernel_level);
+
+const char *pagerank_simd_backend()
+{
+    return simd_level_name(pagerank_kernel_level);
+}
 
 /**
  * @brief 释放内存
@@ -168,75 +208,21 @@ double *pagerank(
         }
         dangling_sum = alpha * dangling_sum; // 计算悬挂节点的贡献
 
-#ifdef __AVX2__
-        // 使用AVX2加速运算
-        // 1. 计算悬挂节点贡献和个性化向量贡献
-        {
-            long long i;
-            {
-                __m256d dangling_sum_vec = _mm256_set1_pd(dangling_sum); // 设置悬挂节点贡献向量
-                __m256d n_alpha_vec = _mm256_set1_pd(1.0 - alpha);       // 设置个性化向量系数
-                for (i = 0; i < node_array_size - 4; i += 4)
-                {
-                    __m256d score_vec = _mm256_loadu_pd(&score[i]); // 加载当前Score向量
-                    {
-                        // 使用SIMD指令计算悬挂节点贡献
-                        __m256d dangling_weight_vec_vec = _mm256_loadu_pd(&dangling_weight_vec[i]);      // 加载悬挂节点权重向量
-                        __m256d dangling_vec = _mm256_mul_pd(dangling_sum_vec, dangling_weight_vec_vec); // 计算悬挂节点贡献
-                        score_vec = _mm256_add_pd(score_vec, dangling_vec);                              // 累加悬挂节点贡献
-                    }
-                    {
-                        // 使用SIMD指令计算个性化向量贡献
-                        __m256d personalization_vec_vec = _mm256_loadu_pd(&personalization_vec[i]);             // 加载个性化向量
-                        __m256d personalization_vec_vec3 = _mm256_mul_pd(personalization_vec_vec, n_alpha_vec); // 计算个性化向量贡献
-                        score_vec = _mm256_add_pd(score_vec, personalization_vec_vec3);                         // 累加个性化向量贡献
-                    }
-                    _mm256_storeu_pd(&score[i], score_vec); // 存储结果
-                }
-            }
-            for (; i < node_array_size; ++i)
-            {
-                if (weight_matrix[i].edge_num < 0)
-                    continue; // 跳过无效节点
+        // 计算新的Score向量：1. 计算悬挂节点贡献和个性化向量贡献
+        pagerank_base_kernel(score, dangling_weight_vec, personalization_vec, dangling_sum, 1.0 - alpha, node_array_size);
 
-                // 计算悬挂节点贡献和个性化向量贡献
-                score[i] += dangling_sum * dangling_weight_vec[i];  // 悬挂节点贡献
-                score[i] += (1.0 - alpha) * personalization_vec[i]; // 个性化向量贡献
-            }
-        }
-        // 2. 计算节点间传播贡献
-        {
-            for (long long i = 0; i < node_array_size; ++i)
-            {
-                if (weight_matrix[i].edge_num < 0)
-                    continue; // 跳过无效节点
-
-                double sum_propagation = 0.0L; // 节点间传播贡献
-                // 遍历所有入边
-                for (long long j = 0; j < weight_matrix[i].edge_num; j++)
-                    sum_propagation += last_score[weight_matrix[i].edges[j].src] * weight_matrix[i].edges[j].weight;
-                score[i] += sum_propagation * alpha; // 节点间传播贡献
-            }
-        }
-#else
-        // 使用普通循环计算
+        // 计算新的Score向量：2. 计算节点间传播贡献
         for (long long i = 0; i < node_array_size; i++)
         {
             if (weight_matrix[i].edge_num < 0)
                 continue; // 跳过无效节点
 
-            // 计算新的Score向量：1. 计算悬挂节点贡献和个性化向量贡献
-            score[i] += dangling_sum * dangling_weight_vec[i];  // 悬挂节点贡献
-            score[i] += (1.0 - alpha) * personalization_vec[i]; // 个性化向量贡献
-
-            // 计算新的Score向量：2. 计算节点间传播贡献
             double sum_propagation = 0.0L; // 节点间传播贡献
             // 遍历所有入边
             for (long long j = 0; j < weight_matrix[i].edge_num; j++)
                 sum_propagation += last_score[weight_matrix[i].edges[j].src] * weight_matrix[i].edges[j].weight;
             score[i] += sum_propagation * alpha; // 节点间传播贡献
         }
-#endif
 
         // 检查收敛
         double diff = 0.0L;
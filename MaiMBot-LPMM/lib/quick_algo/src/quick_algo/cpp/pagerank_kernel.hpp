@@ -0,0 +1,38 @@
+#ifndef PAGERANK_KERNEL_H
+#define PAGERANK_KERNEL_H
+
+/**
+ * @brief PageRank基础分数内核
+ *
+ * 计算 score[i] += dangling_sum * dangling_weight_vec[i] + n_alpha * personalization_vec[i]
+ * （无效节点的悬挂权重与个性化向量均为0，故无需跳过）
+ *
+ * 每种SIMD实现位于独立的编译单元中，仅该编译单元使用对应的SIMD编译参数，
+ * 运行时由 pagerank_impl.cpp 依据CPU特性选择具体实现
+ */
+typedef void (*pagerank_base_kernel_t)(
+    double *score,                     // Score向量
+    const double *dangling_weight_vec, // 悬挂节点权重向量
+    const double *personalization_vec, // 个性化向量
+    double dangling_sum,               // 悬挂节点贡献的总量（已乘阻尼系数）
+    double n_alpha,                    // 个性化向量系数（1 - alpha）
+    long long n                        // 向量长度
+);
+
+void pagerank_base_kernel_scalar(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                                 double dangling_sum, double n_alpha, long long n);
+
+// 以下SIMD实现在未以对应指令集编译时退化为标量实现，可通过 *_compiled() 判断
+bool pagerank_kernel_avx2_compiled();
+void pagerank_base_kernel_avx2(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                               double dangling_sum, double n_alpha, long long n);
+
+bool pagerank_kernel_avx512_compiled();
+void pagerank_base_kernel_avx512(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                                 double dangling_sum, double n_alpha, long long n);
+
+bool pagerank_kernel_neon_compiled();
+void pagerank_base_kernel_neon(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                               double dangling_sum, double n_alpha, long long n);
+
+#endif // PAGERANK_KERNEL_H
@@ -0,0 +1,41 @@
+#include "pagerank_kernel.hpp"
+
+// 本文件是唯一使用AVX-512F/FMA编译参数的编译单元
+#ifdef __AVX512F__
+#include <immintrin.h> // SIMD指令集头文件
+
+bool pagerank_kernel_avx512_compiled()
+{
+    return true;
+}
+
+void pagerank_base_kernel_avx512(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                                 double dangling_sum, double n_alpha, long long n)
+{
+    __m512d dangling_sum_vec = _mm512_set1_pd(dangling_sum); // 设置悬挂节点贡献向量
+    __m512d n_alpha_vec = _mm512_set1_pd(n_alpha);           // 设置个性化向量系数
+
+    long long i = 0;
+    for (; i + 8 <= n; i += 8)
+    {
+        __m512d score_vec = _mm512_loadu_pd(&score[i]); // 加载当前Score向量
+        score_vec = _mm512_fmadd_pd(dangling_sum_vec, _mm512_loadu_pd(&dangling_weight_vec[i]), score_vec); // 累加悬挂节点贡献
+        score_vec = _mm512_fmadd_pd(n_alpha_vec, _mm512_loadu_pd(&personalization_vec[i]), score_vec);      // 累加个性化向量贡献
+        _mm512_storeu_pd(&score[i], score_vec);                                                             // 存储结果
+    }
+
+    // 处理剩余元素
+    pagerank_base_kernel_scalar(score + i, dangling_weight_vec + i, personalization_vec + i, dangling_sum, n_alpha, n - i);
+}
+#else
+bool pagerank_kernel_avx512_compiled()
+{
+    return false;
+}
+
+void pagerank_base_kernel_avx512(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                                 double dangling_sum, double n_alpha, long long n)
+{
+    pagerank_base_kernel_scalar(score, dangling_weight_vec, personalization_vec, dangling_sum, n_alpha, n);
+}
+#endif
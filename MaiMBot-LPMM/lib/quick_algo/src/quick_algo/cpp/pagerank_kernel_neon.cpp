@@ -0,0 +1,41 @@
+#include "pagerank_kernel.hpp"
+
+// 双精度NEON指令仅在AArch64上可用
+#if (defined(__aarch64__) || defined(_M_ARM64)) && (defined(__ARM_NEON) || defined(__ARM_NEON__) || defined(_M_ARM64))
+#include <arm_neon.h> // SIMD指令集头文件
+
+bool pagerank_kernel_neon_compiled()
+{
+    return true;
+}
+
+void pagerank_base_kernel_neon(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                               double dangling_sum, double n_alpha, long long n)
+{
+    float64x2_t dangling_sum_vec = vdupq_n_f64(dangling_sum); // 设置悬挂节点贡献向量
+    float64x2_t n_alpha_vec = vdupq_n_f64(n_alpha);           // 设置个性化向量系数
+
+    long long i = 0;
+    for (; i + 2 <= n; i += 2)
+    {
+        float64x2_t score_vec = vld1q_f64(&score[i]);                                              // 加载当前Score向量
+        score_vec = vaddq_f64(score_vec, vmulq_f64(dangling_sum_vec, vld1q_f64(&dangling_weight_vec[i]))); // 累加悬挂节点贡献
+        score_vec = vaddq_f64(score_vec, vmulq_f64(n_alpha_vec, vld1q_f64(&personalization_vec[i])));      // 累加个性化向量贡献
+        vst1q_f64(&score[i], score_vec);                                                           // 存储结果
+    }
+
+    // 处理剩余元素
+    pagerank_base_kernel_scalar(score + i, dangling_weight_vec + i, personalization_vec + i, dangling_sum, n_alpha, n - i);
+}
+#else
+bool pagerank_kernel_neon_compiled()
+{
+    return false;
+}
+
+void pagerank_base_kernel_neon(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                               double dangling_sum, double n_alpha, long long n)
+{
+    pagerank_base_kernel_scalar(score, dangling_weight_vec, personalization_vec, dangling_sum, n_alpha, n);
+}
+#endif
@@ -0,0 +1,11 @@
+#include "pagerank_kernel.hpp"
+
+void pagerank_base_kernel_scalar(double *score, const double *dangling_weight_vec, const double *personalization_vec,
+                                 double dangling_sum, double n_alpha, long long n)
+{
+    for (long long i = 0; i < n; i++)
+    {
+        score[i] += dangling_sum * dangling_weight_vec[i]; // 悬挂节点贡献
+        score[i] += n_alpha * personalization_vec[i];      // 个性化向量贡献
+    }
+}
@@ -0,0 +1,91 @@
+#include <stdlib.h>
+#include <string.h>
+
+#include "simd_dispatch.hpp"
+
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__) || defined(_M_IX86)
+#define QUICK_ALGO_ARCH_X86
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
+#elif defined(__aarch64__) || defined(_M_ARM64)
+#define QUICK_ALGO_ARCH_ARM64
+#endif
+
+/**
+ * @brief 是否通过环境变量强制使用标量实现
+ */
+static bool force_scalar()
+{
+    const char *env = getenv("QUICK_ALGO_FORCE_SCALAR");
+    return env != NULL && strcmp(env, "1") == 0;
+}
+
+#ifdef QUICK_ALGO_ARCH_X86
+/**
+ * @brief 检测CPU与操作系统支持的最高x86 SIMD等级
+ */
+static SimdLevel detect_x86_simd_level()
+{
+#if defined(_MSC_VER)
+    int info[4];
+    __cpuid(info, 0);
+    if (info[0] < 7)
+        return SIMD_LEVEL_SCALAR; // 不支持扩展特性查询
+
+    __cpuid(info, 1);
+    if ((info[2] & (1 << 27)) == 0 || (info[2] & (1 << 28)) == 0 || (info[2] & (1 << 12)) == 0)
+        return SIMD_LEVEL_SCALAR; // 不支持OSXSAVE、AVX或FMA
+
+    unsigned long long xcr0 = _xgetbv(0);
+    if ((xcr0 & 0x6) != 0x6)
+        return SIMD_LEVEL_SCALAR; // 操作系统未启用YMM寄存器状态保存
+
+    __cpuidex(info, 7, 0);
+    if ((info[1] & (1 << 16)) != 0 && (xcr0 & 0xE6) == 0xE6)
+        return SIMD_LEVEL_AVX512; // EBX[16]: AVX-512F，且操作系统启用了ZMM寄存器状态保存
+    if ((info[1] & (1 << 5)) != 0)
+        return SIMD_LEVEL_AVX2; // EBX[5]: AVX2
+    return SIMD_LEVEL_SCALAR;
+#else
+    __builtin_cpu_init();
+    if (!__builtin_cpu_supports("fma"))
+        return SIMD_LEVEL_SCALAR;
+    if (__builtin_cpu_supports("avx512f"))
+        return SIMD_LEVEL_AVX512;
+    if (__builtin_cpu_supports("avx2"))
+        return SIMD_LEVEL_AVX2;
+    return SIMD_LEVEL_SCALAR;
+#endif
+}
+#endif
+
+SimdLevel detect_simd_level()
+{
+    if (force_scalar())
+        return SIMD_LEVEL_SCALAR;
+
+#if defined(QUICK_ALGO_ARCH_X86)
+    return detect_x86_simd_level();
+#elif defined(QUICK_ALGO_ARCH_ARM64)
+    // AArch64 架构下 NEON(ASIMD) 为必选指令集，无需运行时检测
+    return SIMD_LEVEL_NEON;
+#endif
+
+    return SIMD_LEVEL_SCALAR;
+}
+
+const char *simd_level_name(SimdLevel level)
+{
+    switch (level)
+    {
+    case SIMD_LEVEL_AVX512:
+        return "avx512";
+    case SIMD_LEVEL_AVX2:
+        return "avx2";
+    case SIMD_LEVEL_NEON:
+        return "neon";
+    default:
+        return "scalar";
+    }
+}
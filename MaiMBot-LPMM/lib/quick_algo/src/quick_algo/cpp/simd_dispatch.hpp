@@ -0,0 +1,28 @@
+#ifndef SIMD_DISPATCH_H
+#define SIMD_DISPATCH_H
+
+/**
+ * @brief SIMD指令集等级（数值越大，向量宽度越大）
+ *
+ */
+enum SimdLevel
+{
+    SIMD_LEVEL_SCALAR = 0, // 标量实现
+    SIMD_LEVEL_NEON = 1,   // ARM NEON
+    SIMD_LEVEL_AVX2 = 2,   // x86 AVX2 + FMA
+    SIMD_LEVEL_AVX512 = 3, // x86 AVX-512F + FMA
+};
+
+/**
+ * @brief 检测当前CPU支持的最高SIMD等级
+ *
+ * 设置环境变量 QUICK_ALGO_FORCE_SCALAR=1 时强制返回标量实现
+ */
+SimdLevel detect_simd_level();
+
+/**
+ * @brief 获取SIMD等级名称
+ */
+const char *simd_level_name(SimdLevel level);
+
+#endif // SIMD_DISPATCH_H
@@ -11,4 +11,6 @@ cdef extern from "cpp/pagerank.hpp":
             double alpha,
             int max_iter,
             double tol
-    )
\ No newline at end of file
+    )
+
+    const char *pagerank_simd_backend()
@@ -1,6 +1,18 @@
 from quick_algo.di_graph import DiGraph
 
 
+def get_simd_backend() -> str:
+    """
+    Get the SIMD kernel selected for PageRank at import time.
+
+    Set the environment variable QUICK_ALGO_FORCE_SCALAR=1 before importing to force the scalar kernel.
+
+    Returns:
+        str: "avx512", "avx2", "neon" or "scalar".
+    """
+    ...
+
+
 def run_pagerank(
     graph: DiGraph,
     init_score: None | dict[str, float] = None,
@@ -4,7 +4,16 @@ from libc.stdlib cimport free, malloc
 
 from .di_graph cimport DiGraph
 
-__all__ = ["run_pagerank"]
+__all__ = ["run_pagerank", "get_simd_backend"]
+
+
+def get_simd_backend() -> str:
+    """
+    获取PageRank当前使用的SIMD内核（导入模块时依据CPU特性选择）
+    :return: 内核名称（"avx512"、"avx2"、"neon"或"scalar"）
+    """
+    return pagerank_simd_backend().decode("ascii")
+
 
 def run_pagerank(
         graph: DiGraph,
@@ -3,7 +3,7 @@ import random
 import time
 
 import networkx
-from quick_algo.pagerank import run_pagerank
+from quick_algo.pagerank import run_pagerank, get_simd_backend
 from quick_algo.di_graph import DiGraph, DiEdge
 
 
@@ -105,6 +105,13 @@ class TestPageRank:
             assert abs(result[node] - nx_result[node]) < 1e-6, f"Test failed for node {node}"
 
 
+    def test_simd_backend(self):
+        print("Running TestPageRank - 3")
+        # 导入时选择的SIMD内核
+        backend = get_simd_backend()
+        print(f"QuickAlgo PageRank SIMD backend: {backend}")
+        assert backend in ("avx512", "avx2", "neon", "scalar")
+
     def test_pr_speed(self):
         print("Running TestPageRank - 2")
 
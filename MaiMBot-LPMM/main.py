@@ -16,7 +16,6 @@ from src.open_ie import OpenIE
 from src.qa_manager import QAManager
 from src.kg_manager import KGManager
 from global_logger import logger
-from src.utils.hash import get_sha256
 from src.utils.visualize_graph import draw_graph_and_show
 
 
@@ -29,8 +28,8 @@ def hash_deduplicate(
     """Hash去重
 
     Args:
-        raw_paragraphs: 索引的段落原文
-        triple_list_data: 索引的三元组列表
+        raw_paragraphs: 段落原文（以段落hash为键）
+        triple_list_data: 三元组列表（以段落hash为键）
         stored_pg_hashes: 已存储的段落hash集合
         stored_paragraph_hashes: 已存储的段落hash集合
 
@@ -38,22 +37,32 @@ def hash_deduplicate(
         new_raw_paragraphs: 去重后的段落
         new_triple_list_data: 去重后的三元组
     """
+    # 保证已存储的hash集合支持O(1)的成员检查
+    if not isinstance(stored_pg_hashes, (set, frozenset)):
+        stored_pg_hashes = frozenset(stored_pg_hashes)
+    if not isinstance(stored_paragraph_hashes, (set, frozenset)):
+        stored_paragraph_hashes = frozenset(stored_paragraph_hashes)
+    pg_key_prefix = PG_NAMESPACE + "-"
+
+    # 段落hash已在加载OpenIE数据时计算，此处仅需集合运算
+    # 仅当段落同时存在于嵌入库与知识图谱中时，才视为已导入
+    stored_hashes = {
+        paragraph_hash
+        for paragraph_hash in raw_paragraphs.keys() & stored_paragraph_hashes
+        if (pg_key_prefix + paragraph_hash) in stored_pg_hashes
+    }
+
     # 保存去重后的段落
-    new_raw_paragraphs = dict()
+    new_raw_paragraphs = {
+        paragraph_hash: raw_paragraph
+        for paragraph_hash, raw_paragraph in raw_paragraphs.items()
+        if paragraph_hash not in stored_hashes
+    }
     # 保存去重后的三元组
-    new_triple_list_data = dict()
-
-    for _, (raw_paragraph, triple_list) in enumerate(
-        zip(raw_paragraphs.values(), triple_list_data.values())
-    ):
-        # 段落hash
-        paragraph_hash = get_sha256(raw_paragraph)
-        if ((PG_NAMESPACE + "-" + paragraph_hash) in stored_pg_hashes) and (
-            paragraph_hash in stored_paragraph_hashes
-        ):
-            continue
-        new_raw_paragraphs[paragraph_hash] = raw_paragraph
-        new_triple_list_data[paragraph_hash] = triple_list
+    new_triple_list_data = {
+        paragraph_hash: triple_list_data[paragraph_hash]
+        for paragraph_hash in new_raw_paragraphs
+    }
 
     return new_raw_paragraphs, new_triple_list_data
 
@@ -62,19 +71,19 @@ def handle_import_openie(
     openie_data: OpenIE, embed_manager: EmbeddingManager, kg_manager: KGManager
 ) -> bool:
     # 从OpenIE数据中提取段落原文与三元组列表
-    # 索引的段落原文
+    # 段落原文（以段落hash为键）
     raw_paragraphs = openie_data.extract_raw_paragraph_dict()
-    # 索引的实体列表
+    # 实体列表（以段落hash为键）
     entity_list_data = openie_data.extract_entity_dict()
-    # 索引的三元组列表
+    # 三元组列表（以段落hash为键）
     triple_list_data = openie_data.extract_triple_dict()
-    if len(raw_paragraphs) != len(entity_list_data) or len(raw_paragraphs) != len(
-        triple_list_data
+    if (
+        raw_paragraphs.keys() != entity_list_data.keys()
+        or raw_paragraphs.keys() != triple_list_data.keys()
     ):
         logger.error("OpenIE数据存在异常")
         return False
-    # 将索引换为对应段落的hash值
-    logger.info("正在进行段落去重与重索引")
+    logger.info("正在进行段落去重")
     raw_paragraphs, triple_list_data = hash_deduplicate(
         raw_paragraphs,
         triple_list_data,
@@ -83,7 +92,7 @@ def handle_import_openie(
     )
     if len(raw_paragraphs) != 0:
         # 获取嵌入并保存
-        logger.info(f"段落去重完成，剩余待处理的段落数量：{len(raw_paragraphs)}")
+        logger.info("段落去重完成，剩余待处理的段落数量：%d", len(raw_paragraphs))
         logger.info("开始Embedding")
         embed_manager.store_new_data_set(raw_paragraphs, triple_list_data)
         # Embedding-Faiss重索引
@@ -102,6 +111,112 @@ def handle_import_openie(
     return True
 
 
+def _cmd_import_oie(
+    arg: str,
+    embed_manager: EmbeddingManager,
+    kg_manager: KGManager,
+    qa_manager: QAManager,
+    mem_active_manager: MemoryActiveManager,
+):
+    """指令：import oie 导入并处理OpenIE数据"""
+    logger.info("正在导入OpenIE数据文件")
+    try:
+        openie_data = OpenIE.load()
+    except Exception as e:
+        logger.error("导入OpenIE数据文件时发生错误：%s", e)
+        return False
+    if handle_import_openie(openie_data, embed_manager, kg_manager) is False:
+        logger.error("处理OpenIE数据时发生错误")
+        return False
+
+
+def _cmd_qa(
+    arg: str,
+    embed_manager: EmbeddingManager,
+    kg_manager: KGManager,
+    qa_manager: QAManager,
+    mem_active_manager: MemoryActiveManager,
+):
+    """指令：qa 进入QA模式"""
+    logger.info("进入QA模式")
+    while True:
+        print("请在此处输入问题，输入exit退出：", end="")
+        sys.stdout.flush()
+        question = input().strip()
+        if question == "exit":
+            break
+        if question == "":
+            continue
+        qa_manager.answer_question(question)
+
+
+def _cmd_qa_batch(
+    arg: str,
+    embed_manager: EmbeddingManager,
+    kg_manager: KGManager,
+    qa_manager: QAManager,
+    mem_active_manager: MemoryActiveManager,
+):
+    """指令：qa batch <文件路径> 批量回答文件中的问题（每行一个）"""
+    logger.info("正在从文件%s中读取问题", arg)
+    try:
+        with open(arg, "r", encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip() != ""]
+    except OSError as e:
+        logger.error("读取问题文件时发生错误：%s", e)
+        return False
+    logger.info("共读取到%d个问题，开始批量问答", len(questions))
+    qa_manager.answer_questions(questions)
+
+
+def _cmd_activate_test(
+    arg: str,
+    embed_manager: EmbeddingManager,
+    kg_manager: KGManager,
+    qa_manager: QAManager,
+    mem_active_manager: MemoryActiveManager,
+):
+    """指令：activate test 激活度测试"""
+    logger.info("激活度测试")
+    while True:
+        print("请在此处输入问题，输入exit退出：", end="")
+        sys.stdout.flush()
+        question = input().strip()
+        if question == "exit":
+            break
+        if question == "":
+            continue
+        act = mem_active_manager.get_activation(question)
+        print(f"激活度：{act}")
+
+
+def _cmd_export_svg(
+    arg: str,
+    embed_manager: EmbeddingManager,
+    kg_manager: KGManager,
+    qa_manager: QAManager,
+    mem_active_manager: MemoryActiveManager,
+):
+    """指令：export graph-svg 保存RAG图为svg文件"""
+    logger.info("正在保存KG为svg文件")
+    # 将KG输出到svg文件
+    draw_graph_and_show(kg_manager.graph)
+
+
+# 指令分发表：{指令: 处理函数}
+_DISPATCH = {
+    "import oie": _cmd_import_oie,
+    "qa": _cmd_qa,
+    "activate test": _cmd_activate_test,
+    "export graph-svg": _cmd_export_svg,
+}
+
+# 带参数的指令分发表：{指令: 处理函数}，指令之后的内容作为参数传入
+_DISPATCH_WITH_ARG = {
+    "qa batch": _cmd_qa_batch,
+}
+
+
 def process_instruction(
     inst: str,
     embed_manager: EmbeddingManager,
@@ -109,46 +224,17 @@ def process_instruction(
     qa_manager: QAManager,
     mem_active_manager: MemoryActiveManager,
 ):
-    match inst:
-        case "import oie":
-            logger.info("正在导入OpenIE数据文件")
-            try:
-                openie_data = OpenIE.load()
-            except Exception as e:
-                logger.error("导入OpenIE数据文件时发生错误：{}".format(e))
-                return False
-            if handle_import_openie(openie_data, embed_manager, kg_manager) is False:
-                logger.error("处理OpenIE数据时发生错误")
-                return False
-        case "qa":
-            logger.info("进入QA模式")
-            while True:
-                print("请在此处输入问题，输入exit退出：", end="")
-                sys.stdout.flush()
-                question = input().strip()
-                if question == "exit":
-                    break
-                if question == "":
-                    continue
-                qa_manager.answer_question(question)
-        case "activate test":
-            logger.info("激活度测试")
-            while True:
-                print("请在此处输入问题，输入exit退出：", end="")
-                sys.stdout.flush()
-                question = input().strip()
-                if question == "exit":
-                    break
-                if question == "":
-                    continue
-                act = mem_active_manager.get_activation(question)
-                print(f"激活度：{act}")
-        case "export graph-svg":
-            logger.info("正在保存KG为svg文件")
-            # 将KG输出到svg文件
-            draw_graph_and_show(kg_manager.graph)
-        case _:
-            print(f"无效指令：{inst}")
+    # 指令本身不区分大小写，参数（如文件路径）保留大小写
+    words = inst.split(maxsplit=2)
+    arg = ""
+    handler = _DISPATCH.get(" ".join(words).lower())
+    if handler is None and len(words) == 3:
+        handler = _DISPATCH_WITH_ARG.get(" ".join(words[:2]).lower())
+        arg = words[2]
+    if handler is None:
+        print(f"无效指令：{inst}")
+        return None
+    return handler(arg, embed_manager, kg_manager, qa_manager, mem_active_manager)
 
 
 def main():
@@ -169,7 +255,7 @@ def main():
     try:
         embed_manager.load_from_file()
     except Exception as e:
-        logger.error("从文件加载Embedding库时发生错误：{}".format(e))
+        logger.error("从文件加载Embedding库时发生错误：%s", e)
     logger.info("Embedding库加载完成")
     # 初始化KG
     kg_manager = KGManager()
@@ -177,17 +263,17 @@ def main():
     try:
         kg_manager.load_from_file()
     except Exception as e:
-        logger.error("从文件加载KG时发生错误：{}".format(e))
+        logger.error("从文件加载KG时发生错误：%s", e)
     logger.info("KG加载完成")
 
-    logger.info(f"KG节点数量：{len(kg_manager.graph.get_node_list())}")
-    logger.info(f"KG边数量：{len(kg_manager.graph.get_edge_list())}")
+    logger.info("KG节点数量：%d", len(kg_manager.graph.get_node_list()))
+    logger.info("KG边数量：%d", len(kg_manager.graph.get_edge_list()))
 
     # 数据比对：Embedding库与KG的段落hash集合
     for pg_hash in kg_manager.stored_paragraph_hashes:
         key = PG_NAMESPACE + "-" + pg_hash
         if key not in embed_manager.stored_pg_hashes:
-            logger.warning(f"KG中存在Embedding库中不存在的段落：{key}")
+            logger.warning("KG中存在Embedding库中不存在的段落：%s", key)
 
     # 问答系统（用于知识库）
     qa_manager = QAManager(
@@ -209,17 +295,19 @@ def main():
     # 指令：exit 退出
     # 指令：import openie 导入并处理OpenIE数据
     # 指令：qa 进入QA模式
+    # 指令：qa batch <文件路径> 批量回答文件中的问题（每行一个）
     # 指令：export graph-svg 保存RAG图为svg文件
     while True:
         print("LPMM> ", end="")
         sys.stdout.flush()
         instructions = input().strip()
         # 指令解析，允许多指令同时输入，以“|”分隔
-        instruction = [inst.strip() for inst in instructions.lower().split("|")]
+        # （指令本身不区分大小写，但保留参数（如文件路径）的大小写）
+        instruction = [inst.strip() for inst in instructions.split("|")]
         for inst in instruction:
             if inst == "":
                 return True
-            elif inst == "exit":
+            elif inst.lower() == "exit":
                 logger.info("--------退出--------")
                 exit(0)
             elif (
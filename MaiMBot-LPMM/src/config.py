@@ -93,6 +93,8 @@ global_config = dict(
             "provider": "localhost",
             "model": "embed",
             "dimension": 1024,
+            "index_quantization": "fp16",
+            "index_type": "hnsw",
         },
         "rag": {
             "params": {
@@ -13,6 +13,20 @@ from .config import ENT_NAMESPACE, PG_NAMESPACE, REL_NAMESPACE, global_config
 from .utils.hash import get_sha256
 from global_logger import logger
 
+# 向量索引的标量量化方式（"none"表示不量化，使用FP32存储）
+# 检索为内存带宽密集型操作，FP16/INT8量化可将每次检索读取的数据量降为1/2或1/4
+FAISS_QUANTIZER_TYPES = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# HNSW图索引参数
+# 图索引的检索复杂度约为O(log N)，但构建开销较大，项数较少时仍使用暴力检索的Flat索引
+HNSW_M = 32  # 每个节点的邻居数
+HNSW_EF_CONSTRUCTION = 200  # 构建时的候选队列长度
+HNSW_EF_SEARCH_MIN = 64  # 检索时的最小候选队列长度
+HNSW_MIN_ITEMS = 4096  # 使用HNSW索引的最小项数
+
 
 @dataclass
 class EmbeddingStoreItem:
@@ -45,6 +59,8 @@ class EmbeddingStore:
 
         self.faiss_index = None
         self.idx2hash = None
+        # idx2hash的数组形式（下标即Faiss索引中的位置），用于批量转换搜索结果
+        self._idx2hash_array = None
 
     def _get_embedding(self, s: str) -> List[float]:
         return self.llm_client.send_embedding_request(
@@ -123,6 +139,7 @@ class EmbeddingStore:
                 )
                 with open(self.idx2hash_file_path, "r") as f:
                     self.idx2hash = json.load(f)
+                self._idx2hash_array = None
                 logger.info(f"{self.namespace}嵌入库的idx2hash映射加载成功")
             else:
                 raise Exception(f"文件{self.idx2hash_file_path}不存在")
@@ -145,8 +162,45 @@ class EmbeddingStore:
         # L2归一化
         faiss.normalize_L2(embeddings)
         # 构建索引
-        self.faiss_index = faiss.IndexFlatIP(global_config["embedding"]["dimension"])
+        dimension = global_config["embedding"]["dimension"]
+        quantization = global_config["embedding"].get("index_quantization", "none")
+        if quantization not in FAISS_QUANTIZER_TYPES and quantization != "none":
+            logger.warning(f"未知的索引量化方式：{quantization}，将不进行量化")
+            quantization = "none"
+        index_type = global_config["embedding"].get("index_type", "flat")
+        if index_type not in ("flat", "hnsw"):
+            logger.warning(f"未知的索引类型：{index_type}，将使用Flat索引")
+            index_type = "flat"
+        use_hnsw = index_type == "hnsw" and len(embeddings) >= HNSW_MIN_ITEMS
+
+        if use_hnsw and quantization != "none":
+            self.faiss_index = faiss.IndexHNSWSQ(
+                dimension, FAISS_QUANTIZER_TYPES[quantization], HNSW_M, faiss.METRIC_INNER_PRODUCT
+            )
+        elif use_hnsw:
+            self.faiss_index = faiss.IndexHNSWFlat(dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        elif quantization != "none":
+            self.faiss_index = faiss.IndexScalarQuantizer(
+                dimension, FAISS_QUANTIZER_TYPES[quantization], faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            self.faiss_index = faiss.IndexFlatIP(dimension)
+
+        if use_hnsw:
+            self.faiss_index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        if quantization != "none":
+            # INT8量化需依据数据分布训练量化区间
+            self.faiss_index.train(embeddings)
         self.faiss_index.add(embeddings)
+        self._idx2hash_array = None
+
+    def _get_idx2hash_array(self) -> np.ndarray:
+        """获取idx2hash的数组形式"""
+        if self._idx2hash_array is None:
+            self._idx2hash_array = np.array(
+                [self.idx2hash[str(idx)] for idx in range(len(self.idx2hash))], dtype=object
+            )
+        return self._idx2hash_array
 
     def search_top_k(self, query: List[float], k: int) -> List[Tuple[str, float]]:
         """搜索最相似的k个项，以余弦相似度为度量
@@ -156,22 +210,48 @@ class EmbeddingStore:
         Returns:
             result: 最相似的k个项的(hash, 余弦相似度)列表
         """
+        return self.search_top_k_batch([query], k)[0]
+
+    def search_top_k_batch(
+        self, queries: List[List[float]] | np.ndarray, k: int
+    ) -> List[List[Tuple[str, float]]]:
+        """批量搜索最相似的k个项，以余弦相似度为度量
+        （多个查询在一次Faiss检索中完成，由Faiss在查询间并行）
+        Args:
+            queries: 查询的embedding列表（或形状为(N, D)的矩阵）
+            k: 每个查询返回的最相似的k个项
+        Returns:
+            result: 与查询一一对应的最相似的k个项的(hash, 余弦相似度)列表
+        """
         if self.faiss_index is None:
             raise Exception("Faiss索引尚未构建")
         if self.idx2hash is None:
             raise Exception("idx2hash映射尚未构建")
-
-        # L2归一化
-        faiss.normalize_L2(np.array([query], dtype=np.float32))
+        if len(queries) == 0:
+            return []
+
+        # L2归一化（复制一份，避免修改调用方的数据）
+        query_array = np.array(queries, dtype=np.float32)
+        faiss.normalize_L2(query_array)
+        if isinstance(self.faiss_index, faiss.IndexHNSW):
+            # 候选队列长度决定HNSW检索的召回率
+            self.faiss_index.hnsw.efSearch = max(k * 4, HNSW_EF_SEARCH_MIN)
         # 搜索
-        distances, indices = self.faiss_index.search(np.array([query]), k)
-        # 整理结果
-        indices = list(indices.flatten())
-        distances = list(distances.flatten())
+        distances, indices = self.faiss_index.search(query_array, k)
+        # 整理结果（结果不足k个时，Faiss以-1填充索引）
+        idx2hash_array = self._get_idx2hash_array()
+        valid_mask = (indices >= 0) & (indices < len(idx2hash_array))
         result = [
-            (self.idx2hash[str(int(idx))], float(sim))
-            for (idx, sim) in zip(indices, distances)
-            if idx in range(len(self.idx2hash))
+            list(
+                zip(
+                    idx2hash_array[row_indices[row_mask]].tolist(),
+                    row_distances[row_mask].tolist(),
+                    strict=True,
+                )
+            )
+            for row_indices, row_distances, row_mask in zip(
+                indices, distances, valid_mask, strict=True
+            )
         ]
 
         return result
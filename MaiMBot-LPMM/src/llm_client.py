@@ -46,8 +46,22 @@ class LLMClient:
         return reasoning_content, content
 
     def send_embedding_request(self, model, text):
-        """发送嵌入请求，等待返回结果"""
-        text = text.replace("\n", " ")
-        return (
-            self.client.embeddings.create(input=[text], model=model).data[0].embedding
-        )
+        """发送嵌入请求，等待返回结果
+
+        text为字符串时返回单个嵌入向量；为字符串列表时，在一次请求中批量嵌入，
+        返回与输入顺序一致的嵌入向量列表
+        """
+        if isinstance(text, str):
+            text = text.replace("\n", " ")
+            return (
+                self.client.embeddings.create(input=[text], model=model)
+                .data[0]
+                .embedding
+            )
+
+        if len(text) == 0:
+            return []
+        texts = [t.replace("\n", " ") for t in text]
+        response = self.client.embeddings.create(input=texts, model=model)
+        # 按index排序，保证与输入顺序一致
+        return [item.embedding for item in sorted(response.data, key=lambda x: x.index)]
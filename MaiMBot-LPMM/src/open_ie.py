@@ -3,6 +3,7 @@ from typing import Any, Dict, List
 
 
 from .config import INVALID_ENTITY, global_config
+from .utils.hash import get_sha256_batch
 
 
 def _filter_invalid_entities(entities: List[str]) -> List[str]:
@@ -80,6 +81,11 @@ class OpenIE:
             # 过滤无效的三元组
             doc["extracted_triples"] = _filter_invalid_triples(doc["extracted_triples"])
 
+        # 段落原文的SHA256值（与docs一一对应），加载时计算一次，后续提取直接以其为键
+        self.paragraph_hashes = get_sha256_batch(
+            [doc["passage"] for doc in self.docs]
+        )
+
     @staticmethod
     def _from_dict(data):
         """从字典中获取OpenIE对象"""
@@ -117,31 +123,38 @@ class OpenIE:
         ) as f:
             f.write(json.dumps(openie_data._to_dict(), ensure_ascii=False, indent=4))
 
+    def _hashed_docs(self):
+        """按顺序遍历 (段落hash, 文档) 对（paragraph_hashes 由 docs 计算，二者长度必然一致）"""
+        return zip(self.paragraph_hashes, self.docs, strict=True)
+
     def extract_entity_dict(self):
-        """提取实体列表"""
+        """提取实体列表（以段落hash为键）"""
         ner_output_dict = dict(
             {
-                doc_item["idx"]: doc_item["extracted_entities"]
-                for doc_item in self.docs
+                pg_hash: doc_item["extracted_entities"]
+                for pg_hash, doc_item in self._hashed_docs()
                 if len(doc_item["extracted_entities"]) > 0
             }
         )
         return ner_output_dict
 
     def extract_triple_dict(self):
-        """提取三元组列表"""
+        """提取三元组列表（以段落hash为键）"""
         triple_output_dict = dict(
             {
-                doc_item["idx"]: doc_item["extracted_triples"]
-                for doc_item in self.docs
+                pg_hash: doc_item["extracted_triples"]
+                for pg_hash, doc_item in self._hashed_docs()
                 if len(doc_item["extracted_triples"]) > 0
             }
         )
         return triple_output_dict
 
     def extract_raw_paragraph_dict(self):
-        """提取原始段落"""
+        """提取原始段落（以段落hash为键）"""
         raw_paragraph_dict = dict(
-            {doc_item["idx"]: doc_item["passage"] for doc_item in self.docs}
+            {
+                pg_hash: doc_item["passage"]
+                for pg_hash, doc_item in self._hashed_docs()
+            }
         )
         return raw_paragraph_dict
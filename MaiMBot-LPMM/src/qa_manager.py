@@ -29,34 +29,67 @@ class QAManager:
 
     def process_query(self, question: str) -> Tuple[List[Tuple[str, float, float]], Dict[str, float] | None]:
         """处理查询"""
+        return self.process_queries([question])[0]
 
-        # 生成问题的Embedding
+    def process_queries(
+        self, questions: List[str]
+    ) -> List[Tuple[List[Tuple[str, float, float]], Dict[str, float] | None]]:
+        """批量处理查询（Embedding请求与向量检索均批量完成）"""
+        if len(questions) == 0:
+            return []
+
+        # 批量生成问题的Embedding（单次请求）
         part_start_time =time.perf_counter()
-        question_embedding = self.llm_client_list["embedding"].send_embedding_request(
-            global_config["embedding"]["model"], question
+        question_embeddings = self.llm_client_list["embedding"].send_embedding_request(
+            global_config["embedding"]["model"], questions
         )
         part_end_time = time.perf_counter()
-        logger.debug(f"Embedding用时：{part_end_time - part_start_time:.5f}s")
+        logger.debug("Embedding用时：%.5fs", part_end_time - part_start_time)
 
-        # 根据问题Embedding查询Relation Embedding库
+        # 根据问题Embedding批量查询Relation Embedding库
         part_start_time =time.perf_counter()
-        relation_search_res = self.embed_manager.relation_embedding_store.search_top_k(
-            question_embedding,
+        relation_search_res_list = self.embed_manager.relation_embedding_store.search_top_k_batch(
+            question_embeddings,
             global_config["qa"]["params"]["relation_search_top_k"],
         )
+        part_end_time = time.perf_counter()
+        logger.debug("关系检索用时：%.5fs", part_end_time - part_start_time)
+
+        # 根据问题Embedding批量查询Paragraph Embedding库
+        part_start_time =time.perf_counter()
+        paragraph_search_res_list = (
+            self.embed_manager.paragraphs_embedding_store.search_top_k_batch(
+                question_embeddings,
+                global_config["qa"]["params"]["paragraph_search_top_k"],
+            )
+        )
+        part_end_time = time.perf_counter()
+        logger.debug("文段检索用时：%.5fs", part_end_time - part_start_time)
+
+        return [
+            self._process_search_result(relation_search_res, paragraph_search_res)
+            for relation_search_res, paragraph_search_res in zip(
+                relation_search_res_list, paragraph_search_res_list, strict=True
+            )
+        ]
+
+    def _process_search_result(
+        self,
+        relation_search_res: List[Tuple[str, float]],
+        paragraph_search_res: List[Tuple[str, float]],
+    ) -> Tuple[List[Tuple[str, float, float]], Dict[str, float] | None]:
+        """根据单个问题的关系与文段检索结果，得到最终的检索结果"""
         # 过滤阈值
         # 考虑动态阈值：当存在显著数值差异的结果时，保留显著结果；否则，保留所有结果
         relation_search_res = dyn_select_top_k(relation_search_res, 0.5, 1.0)
         if (
-            relation_search_res[0][1]
+            len(relation_search_res) == 0
+            or relation_search_res[0][1]
             < global_config["qa"]["params"]["relation_threshold"]
         ):
             # 未找到相关关系
             relation_search_res = []
 
-        part_end_time = time.perf_counter()
-        logger.debug(f"关系检索用时：{part_end_time - part_start_time:.5f}s")
-
         for res in relation_search_res:
             rel_str = self.embed_manager.relation_embedding_store.store.get(res[0]).str
             print(f"找到相关关系，相似度：{(res[1] * 100):.2f}%  -  {rel_str}")
@@ -65,17 +98,6 @@ class QAManager:
         # logger.info(f"LLM过滤三元组用时：{time.time() - part_start_time:.2f}s")
         # part_start_time = time.time()
 
-        # 根据问题Embedding查询Paragraph Embedding库
-        part_start_time =time.perf_counter()
-        paragraph_search_res = (
-            self.embed_manager.paragraphs_embedding_store.search_top_k(
-                question_embedding,
-                global_config["qa"]["params"]["paragraph_search_top_k"],
-            )
-        )
-        part_end_time = time.perf_counter()
-        logger.debug(f"文段检索用时：{part_end_time - part_start_time:.5f}s")
-
         if len(relation_search_res) != 0:
             logger.info("找到相关关系，将使用RAG进行检索")
             # 使用KG检索
@@ -84,7 +106,7 @@ class QAManager:
                 relation_search_res, paragraph_search_res, self.embed_manager
             )
             part_end_time = time.perf_counter()
-            logger.info(f"RAG检索用时：{part_end_time - part_start_time:.5f}s")
+            logger.info("RAG检索用时：%.5fs", part_end_time - part_start_time)
         else:
             logger.info("未找到相关关系，将使用文段检索结果")
             result = paragraph_search_res
@@ -103,26 +125,33 @@ class QAManager:
 
     def answer_question(self, question: str):
         """回答问题"""
-        start_time = time.time()  # 计时：总用时计算
-        # 处理查询
-        query_res, _ = self.process_query(question)
+        self.answer_questions([question])
 
-        knowledge = [
-            (
-                self.embed_manager.paragraphs_embedding_store.store[res[0]].str,
-                res[1],
+    def answer_questions(self, questions: List[str]):
+        """批量回答问题（检索阶段批量完成，随后逐个问题请求LLM生成答案）"""
+        start_time = time.time()  # 计时：总用时计算
+        # 批量处理查询
+        query_res_list = self.process_queries(questions)
+
+        for question, (query_res, _) in zip(questions, query_res_list, strict=True):
+            if len(questions) > 1:
+                print(f"问题：{question}")
+            knowledge = [
+                (
+                    self.embed_manager.paragraphs_embedding_store.store[res[0]].str,
+                    res[1],
+                )
+                for res in query_res
+            ]
+            # 将检索结果和问题发送给LLM，获取答案
+            # 构造上下文
+            context = prompt_template.build_qa_context(question, knowledge)
+            reasoning, content = self.llm_client_list["qa"].send_chat_request(
+                global_config["qa"]["llm"]["model"], context
             )
-            for res in query_res
-        ]
-        # 将检索结果和问题发送给LLM，获取答案
-        # 构造上下文
-        context = prompt_template.build_qa_context(question, knowledge)
-        reasoning, content = self.llm_client_list["qa"].send_chat_request(
-            global_config["qa"]["llm"]["model"], context
-        )
-        if reasoning is None:
-            print(f"回答：{content}\n")
-        else:
-            print(f"思考：{reasoning}\n回答：{content}\n")
+            if reasoning is None:
+                print(f"回答：{content}\n")
+            else:
+                print(f"思考：{reasoning}\n回答：{content}\n")
 
-        logger.info(f"总用时：{time.time() - start_time:.2f}s")
\ No newline at end of file
+        logger.info("总用时：%.2fs", time.time() - start_time)
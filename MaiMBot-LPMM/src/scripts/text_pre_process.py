@@ -4,20 +4,21 @@ import json
 with open("raw.txt", "r", encoding="utf-8") as f:
     raw = f.read()
 
-# 一行一行的处理文件
+# 一行一行的处理文件（段落内的行先收集到列表中，段落结束时一次性拼接）
 paragraphs = []
-paragraph = ""
+paragraph_lines = []
 for line in raw.split("\n"):
     if line.strip() == "":
         # 有空行，表示段落结束
-        if paragraph != "":
-            paragraphs.append(paragraph)
-            paragraph = ""
+        if paragraph_lines:
+            paragraphs.append("\n".join(paragraph_lines) + "\n")
+            paragraph_lines = []
     else:
-        paragraph += line + "\n"
+        paragraph_lines.append(line)
 
-if paragraph != "":
-    paragraphs.append(paragraph)
+if paragraph_lines:
+    paragraphs.append("\n".join(paragraph_lines) + "\n")
 
+# 输出文件仅供程序读取，不做缩进以减小文件体积
 with open("raw.json", "w", encoding="utf-8") as f:
-    json.dump(paragraphs, f, ensure_ascii=False, indent=4)
+    json.dump(paragraphs, f, ensure_ascii=False)
@@ -1,8 +1,12 @@
-import jsonlines
+import mmap
+import orjson
 from pathlib import Path
 from typing import List, Dict, Any, Union, Optional
 from src.config import global_config as config
 
+# 文件大小达到该阈值时，通过mmap逐行读取，避免将整个文件复制到内存中
+_MMAP_MIN_FILE_SIZE = 8 * 1024 * 1024
+
 
 class DataLoader:
     """数据加载工具类，用于从/data目录下加载各种格式的数据文件"""
@@ -51,8 +55,19 @@ class DataLoader:
             包含所有数据的列表
         """
         file_path = self._resolve_file_path(filename)
-        data = []
-        with jsonlines.open(file_path) as reader:
-            for obj in reader:
-                data.append(obj)
-        return data
+        if file_path.stat().st_size >= _MMAP_MIN_FILE_SIZE:
+            # 大文件：由mmap按行读取，由orjson逐行解析（跳过空行）
+            with open(file_path, "rb") as f, mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mm:
+                return [
+                    orjson.loads(line)
+                    for line in iter(mm.readline, b"")
+                    if line.strip()
+                ]
+        # 小文件：整体读取后按行切分，由orjson逐行解析（跳过空行）
+        return [
+            orjson.loads(line)
+            for line in file_path.read_bytes().splitlines()
+            if line.strip()
+        ]
@@ -1,44 +1,41 @@
 from typing import List, Any, Tuple
 
+import numpy as np
+
 
 def dyn_select_top_k(
     score: List[Tuple[Any, float]], jmp_factor: float, var_factor: float
 ) -> List[Tuple[Any, float, float]]:
     """动态TopK选择"""
-    # 按照分数排序（降序）
-    sorted_score = sorted(score, key=lambda x: x[1], reverse=True)
+    if len(score) == 0:
+        return []
+
+    keys = [score_item[0] for score_item in score]
+    values = np.fromiter(
+        (score_item[1] for score_item in score), dtype=np.float64, count=len(score)
+    )
+
+    # 按照分数排序（降序，稳定排序保持同分项的原有顺序）
+    order = np.argsort(-values, kind="stable")
+    sorted_values = values[order]
 
     # 归一化
-    max_score = sorted_score[0][1]
-    min_score = sorted_score[-1][1]
-    normalized_score = []
-    for score_item in sorted_score:
-        normalized_score.append(
-            tuple(
-                [
-                    score_item[0],
-                    score_item[1],
-                    (score_item[1] - min_score) / (max_score - min_score),
-                ]
-            )
-        )
-
-    # 寻找跳变点：score变化最大的位置
-    jump_idx = 0
-    for i in range(1, len(normalized_score)):
-        if abs(normalized_score[i][2] - normalized_score[i - 1][2]) > abs(
-            normalized_score[jump_idx][2] - normalized_score[jump_idx - 1][2]
-        ):
-            jump_idx = i
+    max_score = sorted_values[0]
+    min_score = sorted_values[-1]
+    if max_score == min_score:
+        # 分数无差异，保留所有结果
+        return [(keys[idx], float(values[idx]), 1.0) for idx in order]
+    normalized_score = (sorted_values - min_score) / (max_score - min_score)
+
+    # 寻找跳变点：score变化最大的位置（首项与末项比较）
+    jump_idx = int(np.argmax(np.abs(normalized_score - np.roll(normalized_score, 1))))
     # 跳变阈值
-    jump_threshold = normalized_score[jump_idx][2]
+    jump_threshold = normalized_score[jump_idx]
 
     # 计算均值
-    mean_score = sum([s[2] for s in normalized_score]) / len(normalized_score)
+    mean_score = normalized_score.mean()
     # 计算方差
-    var_score = sum([(s[2] - mean_score) ** 2 for s in normalized_score]) / len(
-        normalized_score
-    )
+    var_score = normalized_score.var()
 
     # 动态阈值
     threshold = jmp_factor * jump_threshold + (1 - jmp_factor) * (
@@ -46,6 +43,9 @@ def dyn_select_top_k(
     )
 
     # 重新过滤
-    res = [s for s in normalized_score if s[2] > threshold]
+    selected = np.flatnonzero(normalized_score > threshold)
 
-    return res
+    return [
+        (keys[order[i]], float(sorted_values[i]), float(normalized_score[i]))
+        for i in selected
+    ]
@@ -1,4 +1,10 @@
 import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+# 单个线程至少处理的字符串数量，数量过少时线程调度开销会超过并行收益
+_MIN_STRINGS_PER_WORKER = 256
 
 
 def get_sha256(string: str) -> str:
@@ -6,3 +12,31 @@ def get_sha256(string: str) -> str:
     sha256 = hashlib.sha256()
     sha256.update(string.encode("utf-8"))
     return sha256.hexdigest()
+
+
+def _get_sha256_chunk(strings: List[str]) -> List[str]:
+    """获取一组字符串的SHA256值"""
+    return [get_sha256(s) for s in strings]
+
+
+def get_sha256_batch(strings: List[str], max_workers: Optional[int] = None) -> List[str]:
+    """批量获取字符串的SHA256值（结果顺序与输入一致）
+
+    hashlib在计算较长输入的摘要时会释放GIL，并由OpenSSL选择硬件加速实现（如SHA-NI），
+    因此将输入分块后交由线程池并行计算
+
+    Args:
+        strings: 字符串列表
+        max_workers: 最大线程数，默认为CPU核心数
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(strings) // _MIN_STRINGS_PER_WORKER)
+    if max_workers <= 1:
+        return _get_sha256_chunk(strings)
+
+    # 按线程数分块，每个线程处理一块，避免逐项提交任务的调度开销
+    chunk_size = -(-len(strings) // max_workers)
+    chunks = [strings[i : i + chunk_size] for i in range(0, len(strings), chunk_size)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [h for chunk_hashes in executor.map(_get_sha256_chunk, chunks) for h in chunk_hashes]
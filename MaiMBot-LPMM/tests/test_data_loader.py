@@ -1,6 +1,8 @@
 import unittest
 from pathlib import Path
+from unittest import mock
 import jsonlines
+from src.utils import data_loader
 from src.utils.data_loader import DataLoader
 import logging
 import json
@@ -107,6 +109,37 @@ class TestDataLoader(unittest.TestCase):
 
         self.logger.info("✓ load_jsonl测试通过")
 
+    def test_load_jsonl_blank_lines(self):
+        """测试load_jsonl跳过空行并兼容CRLF换行"""
+        self.logger.info("测试load_jsonl空行处理...")
+
+        crlf_file = self.test_data_dir / "test_data_crlf.jsonl"
+        lines = [json.dumps(item, ensure_ascii=False) for item in self.test_data]
+        crlf_file.write_bytes(("\r\n\r\n".join(lines) + "\r\n\n").encode("utf-8"))
+        try:
+            loaded_data = self.data_loader.load_jsonl(crlf_file.name)
+            self.assertEqual(loaded_data, self.test_data)
+        finally:
+            crlf_file.unlink()
+
+        self.logger.info("✓ load_jsonl空行处理测试通过")
+
+    def test_load_jsonl_mmap(self):
+        """测试大文件（mmap）路径的load_jsonl"""
+        self.logger.info("测试load_jsonl mmap读取...")
+
+        mmap_file = self.test_data_dir / "test_data_mmap.jsonl"
+        lines = [json.dumps(item, ensure_ascii=False) for item in self.test_data]
+        mmap_file.write_bytes(("\r\n\r\n".join(lines)).encode("utf-8"))
+        try:
+            with mock.patch.object(data_loader, "_MMAP_MIN_FILE_SIZE", 0):
+                loaded_data = self.data_loader.load_jsonl(mmap_file.name)
+            self.assertEqual(loaded_data, self.test_data)
+        finally:
+            mmap_file.unlink()
+
+        self.logger.info("✓ load_jsonl mmap读取测试通过")
+
 
 if __name__ == "__main__":
     unittest.main()
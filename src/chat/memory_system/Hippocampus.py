@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import bisect
 import datetime
+import functools
+import hashlib
 import math
 import random
 import time
@@ -16,38 +20,58 @@ from rich.traceback import install
 
 from src.llm_models.utils_model import LLMRequest
 from src.config.config import global_config, model_config
+from src.common.database.database import db
 from src.common.database.database_model import GraphNodes, GraphEdges  # Peewee Models导入
 from src.common.logger import get_logger
 from src.chat.utils.chat_message_builder import (
     build_readable_messages,
     get_raw_msg_by_timestamp_with_chat_inclusive,
 )  # 导入 build_readable_messages
+from src.common.message_repository import count_messages
 # 添加cosine_similarity函数
 def cosine_similarity(v1, v2):
     """计算余弦相似度"""
     dot_product = np.dot(v1, v2)
-    norm1 = np.linalg.norm(v1)
-    norm2 = np.linalg.norm(v2)
-    if norm1 == 0 or norm2 == 0:
+    # 直接计算平方范数，仅开方一次，避免np.linalg.norm的额外开销
+    norm1_sq = np.vdot(v1, v1).real
+    norm2_sq = np.vdot(v2, v2).real
+    if norm1_sq == 0 or norm2_sq == 0:
         return 0
-    return dot_product / (norm1 * norm2)
+    return dot_product / math.sqrt(norm1_sq * norm2_sq)
+
+
+@functools.lru_cache(maxsize=100_000)
+def get_word_set(text: str) -> frozenset:
+    """获取文本的分词集合（带缓存，记忆节点名称会在多次检索中被反复分词）"""
+    return frozenset(jieba.lcut(text))
 
 
 install(extra_lines=3)
 
 
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """返回values中最大的k个元素的下标，按值降序排列，值相同时保持原有顺序（与稳定排序取前k个一致）"""
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(values):
+        # 先用argpartition求第k大的值，仅对不小于该值的候选元素排序
+        kth_value = values[np.argpartition(-values, k - 1)[k - 1]]
+        candidates = np.flatnonzero(values >= kth_value)
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(-values[candidates], kind="stable")[:k]]
+
+
 def calculate_information_content(text):
     """计算文本的信息量（熵）"""
-    char_count = Counter(text)
     total_chars = len(text)
     if total_chars == 0:
         return 0
-    entropy = 0
-    for count in char_count.values():
-        probability = count / total_chars
-        entropy -= probability * math.log2(probability)
-
-    return entropy
+    char_count = Counter(text)
+    # 向量化计算各字符概率与熵，避免逐字符的Python循环
+    counts = np.fromiter(char_count.values(), dtype=np.float64, count=len(char_count))
+    probabilities = counts / total_chars
+    return float(np.dot(probabilities, np.log2(total_chars / counts)))
 
 
 
@@ -55,6 +79,15 @@ def calculate_information_content(text):
 
 logger = get_logger("memory")
 
+# 根据文本长度决定提取关键词数量的分段表：长度 <= _KEYWORD_LEN_THRESHOLDS[i] 时使用 _KEYWORD_TOPIC_NUMS[i]
+# 6-12字符 (27.18%的文本)、13-20字符 (22.76%)、21-30字符 (10.33%)、31-50字符 (9.79%)、51+字符 (其余长文本)
+_KEYWORD_LEN_THRESHOLDS = (12, 20, 30, 50)
+_KEYWORD_TOPIC_NUMS = ([1, 3], [2, 4], [3, 5], [4, 5], 5)
+
+# LLM返回的 <主题> 提取与主题分隔符（中英文逗号、顿号、空格）
+_TOPIC_RE = re.compile(r"<([^>]+)>")
+_TOPIC_SEP_RE = re.compile(r"[,，、 ]+")
+
 
 
 
@@ -65,22 +98,186 @@ logger = get_logger("memory")
 class MemoryGraph:
     def __init__(self):
         self.G = nx.Graph()  # 使用 networkx 的图结构
+        # 邻接表快照 {节点: (邻居, ...)}，在图结构变化后失效，下次访问时重建
+        self._neighbor_cache: dict[str, tuple[str, ...]] | None = None
+        # CSR形式的邻接矩阵快照，与邻接表快照一同重建，见 csr_adjacency()
+        self._csr_cache: tuple[list[str], dict[str, int], np.ndarray, np.ndarray, np.ndarray] | None = None
+        # 边在CSR数组中的位置 {(节点1, 节点2): 下标}，两个方向均有记录，用于原地更新连接强度
+        self._edge_positions: dict[tuple[str, str], int] | None = None
+        # 节点名称分词倒排索引 (节点列表, 各节点词数, {词: 包含该词的节点下标数组})
+        self._token_index: tuple[list[str], np.ndarray, dict[str, np.ndarray]] | None = None
+        # 自上次同步数据库以来新增/修改的节点与边，以及被删除的节点与边（边以 edge_key() 表示）
+        self.dirty_nodes: set[str] = set()
+        self.dirty_edges: set[tuple[str, str]] = set()
+        self.removed_nodes: set[str] = set()
+        self.removed_edges: set[tuple[str, str]] = set()
+
+    @staticmethod
+    def edge_key(concept1, concept2) -> tuple[str, str]:
+        """无向边的规范化键（两端节点按字典序排列）"""
+        return (concept1, concept2) if str(concept1) <= str(concept2) else (concept2, concept1)
+
+    def mark_node_dirty(self, concept):
+        """标记节点已新增或修改，下次同步时写入数据库"""
+        self.dirty_nodes.add(concept)
+        self.removed_nodes.discard(concept)
+
+    def mark_edge_dirty(self, concept1, concept2):
+        """标记边已新增或修改，下次同步时写入数据库"""
+        key = self.edge_key(concept1, concept2)
+        self.dirty_edges.add(key)
+        self.removed_edges.discard(key)
+
+    def clear_changes(self):
+        """清空待同步的变更记录（数据库已与内存中的图一致时调用）"""
+        self.dirty_nodes.clear()
+        self.dirty_edges.clear()
+        self.removed_nodes.clear()
+        self.removed_edges.clear()
+
+    def add_edge(self, concept1, concept2, **attr):
+        """添加或覆盖一条边，不存在的端点节点会被一并创建"""
+        for concept in (concept1, concept2):
+            if concept not in self.G:
+                self.mark_node_dirty(concept)
+        self.G.add_edge(concept1, concept2, **attr)
+        self.mark_edge_dirty(concept1, concept2)
+        self.invalidate_cache()
+
+    def remove_edge(self, concept1, concept2):
+        """删除一条边并记录，下次同步时从数据库删除"""
+        self.G.remove_edge(concept1, concept2)
+        key = self.edge_key(concept1, concept2)
+        self.dirty_edges.discard(key)
+        self.removed_edges.add(key)
+        self.invalidate_cache()
+
+    def remove_node(self, concept):
+        """删除节点及其所有边并记录，下次同步时从数据库删除"""
+        neighbors = list(self.G.adj[concept]) if concept in self.G else []
+        self.G.remove_node(concept)  # 节点不存在时抛出 nx.NetworkXError
+        for neighbor in neighbors:
+            key = self.edge_key(concept, neighbor)
+            self.dirty_edges.discard(key)
+            self.removed_edges.add(key)
+        self.dirty_nodes.discard(concept)
+        self.removed_nodes.add(concept)
+        self.invalidate_cache()
+
+    def invalidate_cache(self):
+        """图结构发生变化（增删节点/边）后调用，使邻接表快照、CSR快照与分词索引失效"""
+        self._neighbor_cache = None
+        self._csr_cache = None
+        self._edge_positions = None
+        self._token_index = None
+
+    def _build_cache(self):
+        """重建邻接表快照与CSR快照（邻居顺序与networkx邻接表一致）"""
+        node_names = list(self.G.nodes())
+        node_index = {node: idx for idx, node in enumerate(node_names)}
+        neighbor_cache = {}
+        edge_positions = {}
+        indptr = np.zeros(len(node_names) + 1, dtype=np.intp)
+        indices = []
+        inv_strengths = []
+        for idx, (u, nbrs) in enumerate(self.G.adjacency()):
+            neighbor_cache[u] = tuple(nbrs)
+            for v, edge_data in nbrs.items():
+                edge_positions[(u, v)] = len(indices)
+                indices.append(node_index[v])
+                inv_strengths.append(1 / edge_data.get("strength", 1))
+            indptr[idx + 1] = len(indices)
+        self._neighbor_cache = neighbor_cache
+        self._edge_positions = edge_positions
+        self._csr_cache = (
+            node_names,
+            node_index,
+            indptr,
+            np.array(indices, dtype=np.intp),
+            np.array(inv_strengths, dtype=np.float64),
+        )
+
+    def neighbors(self, node) -> tuple[str, ...]:
+        """获取节点的邻居（基于邻接表快照，避免每次检索都通过networkx构建邻居视图）"""
+        if self._neighbor_cache is None:
+            self._build_cache()
+        return self._neighbor_cache.get(node, ())
+
+    def csr_adjacency(self) -> tuple[list[str], dict[str, int], np.ndarray, np.ndarray, np.ndarray]:
+        """获取CSR形式的邻接矩阵快照
+
+        Returns:
+            tuple: (节点列表, {节点: 下标}, indptr, indices, 各边连接强度的倒数)
+                节点i的邻居为 indices[indptr[i]:indptr[i + 1]]
+        """
+        if self._csr_cache is None:
+            self._build_cache()
+        return self._csr_cache
+
+    def token_index(self) -> tuple[list[str], np.ndarray, dict[str, np.ndarray]]:
+        """获取节点名称的分词倒排索引，用于批量计算关键词与所有节点的词集合相似度
+
+        Returns:
+            tuple: (节点列表, 各节点分词集合大小, {词: 包含该词的节点下标数组})
+        """
+        if self._token_index is None:
+            node_names = list(self.G.nodes())
+            node_word_counts = np.empty(len(node_names), dtype=np.float64)
+            postings: dict[str, list[int]] = {}
+            for idx, node in enumerate(node_names):
+                node_words = get_word_set(node)
+                node_word_counts[idx] = len(node_words)
+                for word in node_words:
+                    postings.setdefault(word, []).append(idx)
+            word_postings = {word: np.array(ids, dtype=np.intp) for word, ids in postings.items()}
+            self._token_index = (node_names, node_word_counts, word_postings)
+        return self._token_index
+
+    def sample_edges(self, k: int) -> list[tuple[str, str]]:
+        """随机抽取k条不同的边（不超过边总数）
+
+        CSR快照有效时直接在快照上抽样，无需展开全部边的列表：每条无向边在CSR中以两个方向各出现一次，
+        因此均匀抽取位置等价于按边均匀抽样。快照已失效时不为抽样重建（重建需遍历全部边，开销更大）
+        """
+        edge_count = self.G.number_of_edges()
+        k = min(k, edge_count)
+        if self._csr_cache is None or k * 2 > edge_count:
+            # 快照失效，或抽样比例较大时拒绝采样效率低，直接从全部边中抽取
+            return random.sample(list(self.G.edges()), k)
+
+        node_names, _, indptr, indices, _ = self._csr_cache
+        sampled: dict[tuple[str, str], tuple[str, str]] = {}
+        while len(sampled) < k:
+            pos = random.randrange(len(indices))
+            source = node_names[int(np.searchsorted(indptr, pos, side="right")) - 1]
+            target = node_names[indices[pos]]
+            sampled.setdefault(self.edge_key(source, target), (source, target))
+        return list(sampled.values())
+
+    def set_edge_strength(self, concept1, concept2, strength: int):
+        """更新已存在的边的连接强度，并原地更新CSR快照"""
+        self.G[concept1][concept2]["strength"] = strength
+        self.mark_edge_dirty(concept1, concept2)
+        if self._csr_cache is not None:
+            inv_strengths = self._csr_cache[4]
+            inv_strengths[self._edge_positions[(concept1, concept2)]] = 1 / strength
+            inv_strengths[self._edge_positions[(concept2, concept1)]] = 1 / strength
 
     def connect_dot(self, concept1, concept2):
         # 避免自连接
         if concept1 == concept2:
             return
 
-        current_time = datetime.datetime.now().timestamp()
+        current_time = time.time()
 
         # 如果边已存在,增加 strength
         if self.G.has_edge(concept1, concept2):
-            self.G[concept1][concept2]["strength"] = self.G[concept1][concept2].get("strength", 1) + 1
+            self.set_edge_strength(concept1, concept2, self.G[concept1][concept2].get("strength", 1) + 1)
             # 更新最后修改时间
             self.G[concept1][concept2]["last_modified"] = current_time
         else:
             # 如果是新边,初始化 strength 为 1
-            self.G.add_edge(
+            self.add_edge(
                 concept1,
                 concept2,
                 strength=1,
@@ -89,7 +286,7 @@ class MemoryGraph:
             )  # 添加最后修改时间
 
     async def add_dot(self, concept, memory, hippocampus_instance=None):
-        current_time = datetime.datetime.now().timestamp()
+        current_time = time.time()
 
         if concept in self.G:
             if "memory_items" in self.G.nodes[concept]:
@@ -131,6 +328,10 @@ class MemoryGraph:
                 created_time=current_time,  # 添加创建时间
                 last_modified=current_time,
             )  # 添加最后修改时间
+            self.invalidate_cache()
+        # 记忆内容已变化，清除缓存的特征值
+        self.G.nodes[concept].pop("hash", None)
+        self.mark_node_dirty(concept)
 
     def get_dot(self, concept):
         # 检查节点是否存在于图中
@@ -144,7 +345,7 @@ class MemoryGraph:
         second_layer_items = []
 
         # 获取相邻节点
-        neighbors = list(self.G.neighbors(topic))
+        neighbors = self.neighbors(topic)
 
         # 获取当前节点的记忆项
         node_data = self.get_dot(topic)
@@ -236,15 +437,15 @@ class MemoryGraph:
             # 既然每个节点现在是一个完整的记忆内容，直接删除整个节点
             if memory_items:
                 # 删除整个节点
-                self.G.remove_node(topic)
+                self.remove_node(topic)
                 return f"删除了节点 {topic} 的完整记忆: {memory_items[:50]}..." if len(memory_items) > 50 else f"删除了节点 {topic} 的完整记忆: {memory_items}"
             else:
                 # 如果没有记忆项，删除该节点
-                self.G.remove_node(topic)
+                self.remove_node(topic)
                 return None
         else:
             # 如果没有memory_items字段，删除该节点
-            self.G.remove_node(topic)
+            self.remove_node(topic)
             return None
 
 
@@ -260,6 +461,8 @@ class Hippocampus:
         # 初始化子组件
         self.entorhinal_cortex = EntorhinalCortex(self)
         self.parahippocampal_gyrus = ParahippocampalGyrus(self)
+        # 预加载jieba词典，避免首次分词时在异步检索中阻塞事件循环
+        jieba.initialize()
         # 从数据库加载记忆图
         self.entorhinal_cortex.sync_memory_from_db()
         self.model_small = LLMRequest(model_set=model_config.model_task_config.utils_small, request_type="memory.modify")
@@ -299,23 +502,25 @@ class Hippocampus:
             return base_activation
 
     @staticmethod
-    def calculate_node_hash(concept, memory_items) -> int:
-        """计算节点的特征值"""
+    def calculate_node_hash(concept, memory_items) -> str:
+        """计算节点的特征值（跨进程稳定，可与数据库中保存的值直接比较）"""
         # memory_items已经是str格式，直接按分隔符分割
         if memory_items:
             unique_items = {item.strip() for item in memory_items.split(" | ") if item.strip()}
         else:
             unique_items = set()
 
-        # 使用frozenset来保证顺序一致性
-        content = f"{concept}:{frozenset(unique_items)}"
-        return hash(content)
+        # 对去重后的记忆排序，保证特征值与记忆顺序无关
+        hasher = hashlib.blake2b(str(concept).encode("utf-8"), digest_size=16)
+        for item in sorted(unique_items):
+            hasher.update(b"\0")
+            hasher.update(item.encode("utf-8"))
+        return hasher.hexdigest()
 
     @staticmethod
-    def calculate_edge_hash(source, target) -> int:
-        """计算边的特征值"""
-        # 直接使用元组，保证顺序一致性
-        return hash((source, target))
+    def calculate_edge_hash(source, target) -> str:
+        """计算边的特征值（跨进程稳定）"""
+        return hashlib.blake2b(f"{source}\0{target}".encode("utf-8"), digest_size=16).hexdigest()
 
     @staticmethod
     def find_topic_llm(text: str, topic_num: int | list[int]):
@@ -359,6 +564,24 @@ class Hippocampus:
         )
         return topic_num
 
+    def word_set_similarities(self, words: frozenset[str]) -> tuple[list[str], np.ndarray]:
+        """通过节点名称的分词倒排索引，批量计算词集合与所有节点名称词集合的余弦相似度
+
+        相似度 = |A∩B| / sqrt(|A|*|B|)，其中 |A∩B| 由各词的倒排列表累加得到，不与words共享任何词的节点不会被访问
+
+        Returns:
+            tuple: (节点列表, 与节点列表一一对应的相似度数组)
+        """
+        node_names, node_word_counts, word_postings = self.memory_graph.token_index()
+        overlap = np.zeros(len(node_names), dtype=np.float64)
+        for word in words:
+            node_ids = word_postings.get(word)
+            if node_ids is not None:
+                overlap[node_ids] += 1
+        denominators = np.sqrt(node_word_counts * len(words))
+        similarities = np.divide(overlap, denominators, out=np.zeros_like(overlap), where=denominators > 0)
+        return node_names, similarities
+
     def get_memory_from_keyword(self, keyword: str, max_depth: int = 2) -> list:
         """从关键词获取相关记忆。
 
@@ -375,28 +598,24 @@ class Hippocampus:
         if not keyword:
             return []
 
-        # 获取所有节点
-        all_nodes = list(self.memory_graph.G.nodes())
         memories = []
 
         # 计算关键词的词集合
-        keyword_words = set(jieba.cut(keyword))
-
-        # 遍历所有节点，计算相似度
-        for node in all_nodes:
-            node_words = set(jieba.cut(node))
-            all_words = keyword_words | node_words
-            v1 = [1 if word in keyword_words else 0 for word in all_words]
-            v2 = [1 if word in node_words else 0 for word in all_words]
-            similarity = cosine_similarity(v1, v2)
-
-            # 如果相似度超过阈值，获取该节点的记忆
-            if similarity >= 0.3:  # 可以调整这个阈值
-                node_data = self.memory_graph.G.nodes[node]
-                memory_items = node_data.get("memory_items", "")
-                # 直接使用完整的记忆内容
-                if memory_items:
-                    memories.append((node, memory_items, similarity))
+        keyword_words = get_word_set(keyword)
+        if not keyword_words:
+            return []
+
+        # 批量计算关键词与所有节点的词集合余弦相似度
+        node_names, similarities = self.word_set_similarities(keyword_words)
+
+        # 如果相似度超过阈值，获取该节点的记忆
+        for idx in np.flatnonzero(similarities >= 0.3):  # 可以调整这个阈值
+            node = node_names[idx]
+            node_data = self.memory_graph.G.nodes[node]
+            memory_items = node_data.get("memory_items", "")
+            # 直接使用完整的记忆内容
+            if memory_items:
+                memories.append((node, memory_items, float(similarities[idx])))
 
         # 按相似度降序排序
         memories.sort(key=lambda x: x[2], reverse=True)
@@ -427,35 +646,84 @@ class Hippocampus:
 
     
         
-        if text_length <= 12:
-            topic_num = [1, 3]  # 6-10字符: 1个关键词 (27.18%的文本)
-        elif text_length <= 20:
-            topic_num = [2, 4]  # 11-20字符: 2个关键词 (22.76%的文本)
-        elif text_length <= 30:
-            topic_num = [3, 5]  # 21-30字符: 3个关键词 (10.33%的文本)
-        elif text_length <= 50:
-            topic_num = [4, 5]  # 31-50字符: 4个关键词 (9.79%的文本)
-        else:
-            topic_num = 5  # 51+字符: 5个关键词 (其余长文本)
+        # 按文本长度查表确定关键词数量
+        topic_num = _KEYWORD_TOPIC_NUMS[bisect.bisect_left(_KEYWORD_LEN_THRESHOLDS, text_length)]
 
         topics_response, _ = await self.model_small.generate_response_async(self.find_topic_llm(text, topic_num))
 
         # 提取关键词
-        keywords = re.findall(r"<([^>]+)>", topics_response)
-        if not keywords:
-            keywords = []
-        else:
-            keywords = [
-                keyword.strip()
-                for keyword in ",".join(keywords).replace("，", ",").replace("、", ",").replace(" ", ",").split(",")
-                if keyword.strip()
-            ]
+        keywords = _TOPIC_RE.findall(topics_response)
+        if keywords:
+            keywords = [keyword.strip() for keyword in _TOPIC_SEP_RE.split(",".join(keywords)) if keyword.strip()]
 
         if keywords:
             logger.debug(f"提取关键词: {keywords}")
 
         return keywords,keywords_lite
 
+    def _spread_activation(self, keywords: list[str], max_depth: int, seed_activation: float = 1.0) -> dict[str, float]:
+        """以关键词为中心在记忆图中进行扩散式检索（基于CSR快照的逐层广度优先扩散）。
+
+        Args:
+            keywords (list[str]): 作为扩散起点的关键词（需存在于记忆图中）
+            max_depth (int): 最大扩散深度
+            seed_activation (float, optional): 关键词节点自身计入的激活值。默认为1.0。
+
+        Returns:
+            dict[str, float]: 各节点的累计激活值
+        """
+        node_names, node_index, indptr, indices, inv_strengths = self.memory_graph.csr_adjacency()
+        activate_map = {}  # 存储每个词的累计激活值
+
+        for keyword in keywords:
+            logger.debug(f"开始以关键词 '{keyword}' 为中心进行扩散检索 (最大深度: {max_depth}):")
+            # 记录已访问的节点
+            visited = np.zeros(len(node_names), dtype=bool)
+            seed = node_index[keyword]
+            visited[seed] = True
+            # 初始化激活值，按被激活的顺序记录(节点下标, 激活值)
+            activated_ids = [seed]
+            activated_values = [seed_activation]
+            # 当前层待处理的节点及其激活值（按入队顺序）
+            frontier_ids = np.array([seed], dtype=np.intp)
+            frontier_values = np.array([1.0])
+
+            # 逐层扩散：一次性展开当前层所有节点的邻居
+            for _ in range(max_depth):
+                starts = indptr[frontier_ids]
+                counts = indptr[frontier_ids + 1] - starts
+                total = int(counts.sum())
+                if total == 0:
+                    break
+                # 当前层所有邻接边在CSR数组中的位置（保持节点顺序与邻居顺序）
+                edge_offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+                neighbor_ids = indices[edge_offsets]
+                # 计算新的激活值
+                new_values = np.repeat(frontier_values, counts) - inv_strengths[edge_offsets]
+
+                # 仅激活值为正且未访问过的邻居会被激活；同一邻居被多次到达时，以最先到达者为准
+                valid = (new_values > 0) & ~visited[neighbor_ids]
+                neighbor_ids = neighbor_ids[valid]
+                new_values = new_values[valid]
+                _, first_positions = np.unique(neighbor_ids, return_index=True)
+                first_positions.sort()
+                frontier_ids = neighbor_ids[first_positions]
+                frontier_values = new_values[first_positions]
+                if len(frontier_ids) == 0:
+                    break
+
+                visited[frontier_ids] = True
+                activated_ids.extend(frontier_ids.tolist())
+                activated_values.extend(frontier_values.tolist())
+
+            # 更新激活映射
+            for node_id, activation_value in zip(activated_ids, activated_values, strict=True):
+                if activation_value > 0:
+                    node = node_names[node_id]
+                    activate_map[node] = activate_map.get(node, 0) + activation_value
+
+        return activate_map
+
     async def get_memory_from_topic(
         self,
         keywords: list[str],
@@ -489,126 +757,62 @@ class Hippocampus:
 
         logger.debug(f"有效的关键词: {', '.join(valid_keywords)}")
 
-        # 从每个关键词获取记忆
-        activate_map = {}  # 存储每个词的累计激活值
-
-        # 对每个关键词进行扩散式检索
-        for keyword in valid_keywords:
-            logger.debug(f"开始以关键词 '{keyword}' 为中心进行扩散检索 (最大深度: {max_depth}):")
-            # 初始化激活值
-            activation_values = {keyword: 1.0}
-            # 记录已访问的节点
-            visited_nodes = {keyword}
-            # 待处理的节点队列，每个元素是(节点, 激活值, 当前深度)
-            nodes_to_process = [(keyword, 1.0, 0)]
-
-            while nodes_to_process:
-                current_node, current_activation, current_depth = nodes_to_process.pop(0)
-
-                # 如果激活值小于0或超过最大深度，停止扩散
-                if current_activation <= 0 or current_depth >= max_depth:
-                    continue
-
-                # 获取当前节点的所有邻居
-                neighbors = list(self.memory_graph.G.neighbors(current_node))
-
-                for neighbor in neighbors:
-                    if neighbor in visited_nodes:
-                        continue
-
-                    # 获取连接强度
-                    edge_data = self.memory_graph.G[current_node][neighbor]
-                    strength = edge_data.get("strength", 1)
-
-                    # 计算新的激活值
-                    new_activation = current_activation - (1 / strength)
-
-                    if new_activation > 0:
-                        activation_values[neighbor] = new_activation
-                        visited_nodes.add(neighbor)
-                        nodes_to_process.append((neighbor, new_activation, current_depth + 1))
-                        # logger.debug(
-                        # f"节点 '{neighbor}' 被激活，激活值: {new_activation:.2f} (通过 '{current_node}' 连接，强度: {strength}, 深度: {current_depth + 1})"
-                        # )  # noqa: E501
-
-            # 更新激活映射
-            for node, activation_value in activation_values.items():
-                if activation_value > 0:
-                    if node in activate_map:
-                        activate_map[node] += activation_value
-                    else:
-                        activate_map[node] = activation_value
+        # 对每个关键词进行扩散式检索，得到每个词的累计激活值
+        activate_map = self._spread_activation(valid_keywords, max_depth)
 
         # 基于激活值平方的独立概率选择
         remember_map = {}
         # logger.info("基于激活值平方的归一化选择:")
 
-        # 计算所有激活值的平方和
-        total_squared_activation = sum(activation**2 for activation in activate_map.values())
+        # 计算所有激活值的平方和，并一次性得到归一化的激活值
+        nodes = list(activate_map)
+        activations = np.fromiter(activate_map.values(), dtype=np.float64, count=len(nodes))
+        squared_activations = activations * activations
+        total_squared_activation = squared_activations.sum()
         if total_squared_activation > 0:
-            # 计算归一化的激活值
-            normalized_activations = {
-                node: (activation**2) / total_squared_activation for node, activation in activate_map.items()
-            }
+            normalized_activations = squared_activations / total_squared_activation
 
-            # 按归一化激活值排序并选择前max_memory_num个
-            sorted_nodes = sorted(normalized_activations.items(), key=lambda x: x[1], reverse=True)[:max_memory_num]
-
-            # 将选中的节点添加到remember_map
-            for node, normalized_activation in sorted_nodes:
+            # 选择归一化激活值最高的前max_memory_num个（部分选择，无需对全部节点排序）
+            for idx in _top_k_indices(normalized_activations, max_memory_num):
+                node = nodes[idx]
                 remember_map[node] = activate_map[node]  # 使用原始激活值
                 logger.debug(
-                    f"节点 '{node}' (归一化激活值: {normalized_activation:.2f}, 激活值: {activate_map[node]:.2f})"
+                    f"节点 '{node}' (归一化激活值: {normalized_activations[idx]:.2f}, 激活值: {activate_map[node]:.2f})"
                 )
         else:
             logger.info("没有有效的激活值")
 
-        # 从选中的节点中提取记忆
-        all_memories = []
-        # logger.info("开始从选中的节点中提取记忆:")
-        for node, activation in remember_map.items():
-            logger.debug(f"处理节点 '{node}' (激活值: {activation:.2f}):")
-            node_data = self.memory_graph.G.nodes[node]
-            memory_items = node_data.get("memory_items", "")
-            # 直接使用完整的记忆内容
-            if memory_items:
-                logger.debug("节点包含完整记忆")
-                # 计算记忆与关键词的相似度
-                memory_words = set(jieba.cut(memory_items))
-                text_words = set(keywords)
-                all_words = memory_words | text_words
-                if all_words:
-                    # 计算相似度（虽然这里没有使用，但保持逻辑一致性）
-                    v1 = [1 if word in memory_words else 0 for word in all_words]
-                    v2 = [1 if word in text_words else 0 for word in all_words]
-                    _ = cosine_similarity(v1, v2)  # 计算但不使用，用_表示
-                    
-                    # 添加完整记忆到结果中
-                    all_memories.append((node, memory_items, activation))
-            else:
-                logger.info("节点没有记忆")
+        return self._finalize_memories(remember_map)
 
-        # 去重（基于记忆内容）
-        logger.debug("开始记忆去重:")
-        seen_memories = set()
-        unique_memories = []
-        for topic, memory_items, activation_value in all_memories:
-            # memory_items现在是完整的字符串格式
-            memory = memory_items if memory_items else ""
-            if memory not in seen_memories:
-                seen_memories.add(memory)
-                unique_memories.append((topic, memory_items, activation_value))
-                logger.debug(f"保留记忆: {memory} (来自节点: {topic}, 激活值: {activation_value:.2f})")
-            else:
-                logger.debug(f"跳过重复记忆: {memory} (来自节点: {topic})")
+    def _finalize_memories(self, remember_map: dict[str, float]) -> list[tuple[str, str]]:
+        """从选中的节点中提取记忆，按记忆内容去重后转换为 (主题, 记忆) 格式
 
-        # 转换为(关键词, 记忆)格式
+        Args:
+            remember_map (dict): {节点: 激活值}，按选择顺序排列
+
+        Returns:
+            list: 记忆列表，每个元素是一个元组 (topic, memory_content)
+        """
+        seen_memories = set()
         result = []
-        for topic, memory_items, _ in unique_memories:
+        empty_nodes = []
+        for node, activation in remember_map.items():
+            logger.debug(f"处理节点 '{node}' (激活值: {activation:.2f}):")
             # memory_items现在是完整的字符串格式
-            memory = memory_items if memory_items else ""
-            result.append((topic, memory))
-            logger.debug(f"选中记忆: {memory} (来自节点: {topic})")
+            memory = self.memory_graph.G.nodes[node].get("memory_items", "")
+            if not memory:
+                # 空节点先记录下来，循环结束后汇总输出一条日志
+                empty_nodes.append(node)
+                continue
+            if memory in seen_memories:
+                logger.debug(f"跳过重复记忆: {memory} (来自节点: {node})")
+                continue
+            seen_memories.add(memory)
+            result.append((node, memory))
+            logger.debug(f"选中记忆: {memory} (来自节点: {node}, 激活值: {activation:.2f})")
+
+        if empty_nodes:
+            logger.info(f"{len(empty_nodes)} 个节点没有记忆: {', '.join(empty_nodes[:5])}")
 
         return result
 
@@ -636,54 +840,8 @@ class Hippocampus:
 
         logger.debug(f"有效的关键词: {', '.join(valid_keywords)}")
 
-        # 从每个关键词获取记忆
-        activate_map = {}  # 存储每个词的累计激活值
-
-        # 对每个关键词进行扩散式检索
-        for keyword in valid_keywords:
-            logger.debug(f"开始以关键词 '{keyword}' 为中心进行扩散检索 (最大深度: {max_depth}):")
-            # 初始化激活值
-            activation_values = {keyword: 1.5}
-            # 记录已访问的节点
-            visited_nodes = {keyword}
-            # 待处理的节点队列，每个元素是(节点, 激活值, 当前深度)
-            nodes_to_process = [(keyword, 1.0, 0)]
-
-            while nodes_to_process:
-                current_node, current_activation, current_depth = nodes_to_process.pop(0)
-
-                # 如果激活值小于0或超过最大深度，停止扩散
-                if current_activation <= 0 or current_depth >= max_depth:
-                    continue
-
-                # 获取当前节点的所有邻居
-                neighbors = list(self.memory_graph.G.neighbors(current_node))
-
-                for neighbor in neighbors:
-                    if neighbor in visited_nodes:
-                        continue
-
-                    # 获取连接强度
-                    edge_data = self.memory_graph.G[current_node][neighbor]
-                    strength = edge_data.get("strength", 1)
-
-                    # 计算新的激活值
-                    new_activation = current_activation - (1 / strength)
-
-                    if new_activation > 0:
-                        activation_values[neighbor] = new_activation
-                        visited_nodes.add(neighbor)
-                        nodes_to_process.append((neighbor, new_activation, current_depth + 1))
-                        # logger.debug(
-                        # f"节点 '{neighbor}' 被激活，激活值: {new_activation:.2f} (通过 '{current_node}' 连接，强度: {strength}, 深度: {current_depth + 1})")  # noqa: E501
-
-            # 更新激活映射
-            for node, activation_value in activation_values.items():
-                if activation_value > 0:
-                    if node in activate_map:
-                        activate_map[node] += activation_value
-                    else:
-                        activate_map[node] = activation_value
+        # 对每个关键词进行扩散式检索，得到每个词的累计激活值
+        activate_map = self._spread_activation(valid_keywords, max_depth, seed_activation=1.5)
 
         # 输出激活映射
         # logger.info("激活映射统计:")
@@ -708,257 +866,297 @@ class EntorhinalCortex:
         self.hippocampus = hippocampus
         self.memory_graph = hippocampus.memory_graph
 
+    def _node_hash(self, concept, data: dict) -> str:
+        """获取节点的特征值，计算结果缓存在节点属性中，记忆内容变化时由 MemoryGraph.add_dot 清除"""
+        node_hash = data.get("hash")
+        if node_hash is None:
+            node_hash = data["hash"] = self.hippocampus.calculate_node_hash(concept, data.get("memory_items", ""))
+        return node_hash
+
     async def sync_memory_to_db(self):
-        """将记忆图同步到数据库"""
+        """将记忆图自上次同步以来的变更（见 MemoryGraph.dirty_nodes 等）同步到数据库"""
         start_time = time.time()
-        current_time = datetime.datetime.now().timestamp()
-
-        # 获取数据库中所有节点和内存中所有节点
-        db_nodes = {node.concept: node for node in GraphNodes.select()}
-        memory_nodes = list(self.memory_graph.G.nodes(data=True))
+        current_time = time.time()
+        graph = self.memory_graph
+        batch_size = 100
 
         # 批量准备节点数据
         nodes_to_create = []
         nodes_to_update = []
-        nodes_to_delete = set()
+        node_rows = {}
+
+        # 处理变更过的节点（期间移除的无效节点会记入 removed_nodes）
+        for concept in list(graph.dirty_nodes):
+            if concept not in graph.G:
+                continue
 
-        # 处理节点
-        for concept, data in memory_nodes:
             if not concept or not isinstance(concept, str):
-                self.memory_graph.G.remove_node(concept)
+                graph.remove_node(concept)
                 continue
 
+            data = graph.G.nodes[concept]
             memory_items = data.get("memory_items", "")
-            
+
             # 直接检查字符串是否为空，不需要分割成列表
             if not memory_items or memory_items.strip() == "":
-                self.memory_graph.G.remove_node(concept)
+                graph.remove_node(concept)
                 continue
 
-            # 计算内存中节点的特征值
-            memory_hash = self.hippocampus.calculate_node_hash(concept, memory_items)
-            created_time = data.get("created_time", current_time)
-            last_modified = data.get("last_modified", current_time)
-
             # memory_items直接作为字符串存储，不需要JSON序列化
-            if not memory_items:
-                continue
-
-            # 获取权重属性
-            weight = data.get("weight", 1.0)
-
-            if concept not in db_nodes:
-                nodes_to_create.append(
-                    {
-                        "concept": concept,
-                        "memory_items": memory_items,
-                        "weight": weight,
-                        "hash": memory_hash,
-                        "created_time": created_time,
-                        "last_modified": last_modified,
-                    }
-                )
-            else:
-                db_node = db_nodes[concept]
-                if db_node.hash != memory_hash:
-                    nodes_to_update.append(
-                        {
-                            "concept": concept,
-                            "memory_items": memory_items,
-                            "weight": weight,
-                            "hash": memory_hash,
-                            "last_modified": last_modified,
-                        }
-                    )
+            node_rows[concept] = {
+                "concept": concept,
+                "memory_items": memory_items,
+                "weight": data.get("weight", 1.0),
+                # 计算内存中节点的特征值（数据库中以文本存储）
+                "hash": self._node_hash(concept, data),
+                "created_time": data.get("created_time", current_time),
+                "last_modified": data.get("last_modified", current_time),
+            }
 
-        # 计算需要删除的节点
-        memory_concepts = {concept for concept, _ in memory_nodes}
-        nodes_to_delete = set(db_nodes.keys()) - memory_concepts
+        # 仅查询变更节点对应的数据库记录，且只读取比较与按主键更新所需的列（不读取较长的记忆内容）
+        db_nodes = {}
+        concepts = list(node_rows)
+        node_query = GraphNodes.select(GraphNodes.id, GraphNodes.concept, GraphNodes.hash)
+        for i in range(0, len(concepts), batch_size):
+            for db_node in node_query.where(GraphNodes.concept.in_(concepts[i : i + batch_size])):
+                db_nodes[db_node.concept] = db_node
+
+        for concept, row in node_rows.items():
+            db_node = db_nodes.get(concept)
+            if db_node is None:
+                nodes_to_create.append(row)
+            elif db_node.hash != row["hash"]:
+                # 直接修改已查询出的模型实例，稍后按主键批量更新
+                db_node.memory_items = row["memory_items"]
+                db_node.weight = row["weight"]
+                db_node.hash = row["hash"]
+                db_node.last_modified = row["last_modified"]
+                nodes_to_update.append(db_node)
+
+        # 计算需要删除的节点（删除后又重新添加的节点不在其中）
+        nodes_to_delete = [concept for concept in graph.removed_nodes if concept not in graph.G]
+
+        # 处理变更过的边与被删除的边
+        edge_rows = {}
+        for source, target in graph.dirty_edges:
+            if not graph.G.has_edge(source, target):
+                continue
+            data = graph.G[source][target]
+            edge_rows[(source, target)] = {
+                "source": source,
+                "target": target,
+                "strength": data.get("strength", 1),
+                "hash": self.hippocampus.calculate_edge_hash(source, target),
+                "created_time": data.get("created_time", current_time),
+                "last_modified": data.get("last_modified", current_time),
+            }
+        removed_edge_keys = {key for key in graph.removed_edges if not graph.G.has_edge(*key)}
 
-        # 批量处理节点
-        if nodes_to_create:
-            batch_size = 100
-            for i in range(0, len(nodes_to_create), batch_size):
-                batch = nodes_to_create[i : i + batch_size]
-                GraphNodes.insert_many(batch).execute()
-
-        if nodes_to_update:
-            batch_size = 100
-            for i in range(0, len(nodes_to_update), batch_size):
-                batch = nodes_to_update[i : i + batch_size]
-                for node_data in batch:
-                    GraphNodes.update(**{k: v for k, v in node_data.items() if k != "concept"}).where(
-                        GraphNodes.concept == node_data["concept"]
-                    ).execute()
-
-        if nodes_to_delete:
-            GraphNodes.delete().where(GraphNodes.concept.in_(nodes_to_delete)).execute()  # type: ignore
-
-        # 处理边的信息
-        db_edges = list(GraphEdges.select())
-        memory_edges = list(self.memory_graph.G.edges(data=True))
-
-        # 创建边的哈希值字典
-        db_edge_dict = {}
-        for edge in db_edges:
-            edge_hash = self.hippocampus.calculate_edge_hash(edge.source, edge.target)
-            db_edge_dict[(edge.source, edge.target)] = {"hash": edge_hash, "strength": edge.strength}
+        # 仅查询涉及变更端点的数据库边记录，数据库中的边可能以任一方向存储
+        db_edges: dict[tuple[str, str], list[GraphEdges]] = {}
+        endpoints = list({concept for key in (*edge_rows, *removed_edge_keys) for concept in key})
+        edge_query = GraphEdges.select(GraphEdges.id, GraphEdges.source, GraphEdges.target)
+        for i in range(0, len(endpoints), batch_size):
+            for db_edge in edge_query.where(GraphEdges.source.in_(endpoints[i : i + batch_size])):
+                db_edges.setdefault(graph.edge_key(db_edge.source, db_edge.target), []).append(db_edge)
 
         # 批量准备边数据
         edges_to_create = []
         edges_to_update = []
+        for key, row in edge_rows.items():
+            if key not in db_edges:
+                edges_to_create.append(row)
+                continue
+            for db_edge in db_edges[key]:
+                db_edge.strength = row["strength"]
+                db_edge.last_modified = row["last_modified"]
+                edges_to_update.append(db_edge)
 
-        # 处理边
-        for source, target, data in memory_edges:
-            edge_hash = self.hippocampus.calculate_edge_hash(source, target)
-            edge_key = (source, target)
-            strength = data.get("strength", 1)
-            created_time = data.get("created_time", current_time)
-            last_modified = data.get("last_modified", current_time)
-
-            if edge_key not in db_edge_dict:
-                edges_to_create.append(
-                    {
-                        "source": source,
-                        "target": target,
-                        "strength": strength,
-                        "hash": edge_hash,
-                        "created_time": created_time,
-                        "last_modified": last_modified,
-                    }
-                )
-            elif db_edge_dict[edge_key]["hash"] != edge_hash:
-                edges_to_update.append(
-                    {
-                        "source": source,
-                        "target": target,
-                        "strength": strength,
-                        "hash": edge_hash,
-                        "last_modified": last_modified,
-                    }
+        # 计算需要删除的边（同一对节点可能存在多行记录，全部删除）
+        edge_ids_to_delete = [db_edge.id for key in removed_edge_keys for db_edge in db_edges.get(key, ())]
+
+        # 在单个事务中批量写入，避免每条语句单独提交
+        with db.atomic():
+            # 批量处理节点
+            for i in range(0, len(nodes_to_create), batch_size):
+                GraphNodes.insert_many(nodes_to_create[i : i + batch_size]).execute()
+
+            if nodes_to_update:
+                GraphNodes.bulk_update(
+                    nodes_to_update,
+                    fields=[GraphNodes.memory_items, GraphNodes.weight, GraphNodes.hash, GraphNodes.last_modified],
+                    batch_size=batch_size,
                 )
 
-        # 计算需要删除的边
-        memory_edge_keys = {(source, target) for source, target, _ in memory_edges}
-        edges_to_delete = set(db_edge_dict.keys()) - memory_edge_keys
+            for i in range(0, len(nodes_to_delete), batch_size):
+                GraphNodes.delete().where(GraphNodes.concept.in_(nodes_to_delete[i : i + batch_size])).execute()  # type: ignore
 
-        # 批量处理边
-        if edges_to_create:
-            batch_size = 100
+            # 批量处理边
             for i in range(0, len(edges_to_create), batch_size):
-                batch = edges_to_create[i : i + batch_size]
-                GraphEdges.insert_many(batch).execute()
-
-        if edges_to_update:
-            batch_size = 100
-            for i in range(0, len(edges_to_update), batch_size):
-                batch = edges_to_update[i : i + batch_size]
-                for edge_data in batch:
-                    GraphEdges.update(**{k: v for k, v in edge_data.items() if k not in ["source", "target"]}).where(
-                        (GraphEdges.source == edge_data["source"]) & (GraphEdges.target == edge_data["target"])
-                    ).execute()
-
-        if edges_to_delete:
-            for source, target in edges_to_delete:
-                GraphEdges.delete().where((GraphEdges.source == source) & (GraphEdges.target == target)).execute()
+                GraphEdges.insert_many(edges_to_create[i : i + batch_size]).execute()
+
+            if edges_to_update:
+                GraphEdges.bulk_update(
+                    edges_to_update,
+                    fields=[GraphEdges.strength, GraphEdges.last_modified],
+                    batch_size=batch_size,
+                )
+
+            for i in range(0, len(edge_ids_to_delete), batch_size):
+                GraphEdges.delete().where(GraphEdges.id.in_(edge_ids_to_delete[i : i + batch_size])).execute()  # type: ignore
+
+        # 写入成功后清空变更记录
+        graph.clear_changes()
 
         end_time = time.time()
         logger.info(f"[数据库] 同步完成，总耗时: {end_time - start_time:.2f}秒")
         logger.info(f"[数据库] 同步了 {len(nodes_to_create) + len(nodes_to_update)} 个节点和 {len(edges_to_create) + len(edges_to_update)} 条边")
 
     async def resync_memory_to_db(self):
-        """清空数据库并重新同步所有记忆数据"""
+        """将内存中的记忆图完整同步到数据库（仅写入有差异的记录，并删除数据库中多余的记录）"""
         start_time = time.time()
         logger.info("[数据库] 开始重新同步所有记忆数据...")
+        graph = self.memory_graph
+        current_time = time.time()
+        batch_size = 100
 
-        # 清空数据库
-        clear_start = time.time()
-        GraphNodes.delete().execute()
-        GraphEdges.delete().execute()
-        clear_end = time.time()
-        logger.info(f"[数据库] 清空数据库耗时: {clear_end - clear_start:.2f}秒")
-
-        # 获取所有节点和边
-        memory_nodes = list(self.memory_graph.G.nodes(data=True))
-        memory_edges = list(self.memory_graph.G.edges(data=True))
-        current_time = datetime.datetime.now().timestamp()
-
-        # 批量准备节点数据
-        nodes_data = []
-        for concept, data in memory_nodes:
+        # 批量准备节点数据 {概念: 行数据}
+        nodes_data = {}
+        for concept, data in list(graph.G.nodes(data=True)):
             memory_items = data.get("memory_items", "")
-            
+
             # 直接检查字符串是否为空，不需要分割成列表
             if not memory_items or memory_items.strip() == "":
-                self.memory_graph.G.remove_node(concept)
+                graph.remove_node(concept)
                 continue
 
-            # 计算内存中节点的特征值
-            memory_hash = self.hippocampus.calculate_node_hash(concept, memory_items)
-            created_time = data.get("created_time", current_time)
-            last_modified = data.get("last_modified", current_time)
-
             # memory_items直接作为字符串存储，不需要JSON序列化
-            if not memory_items:
-                continue
-
-            # 获取权重属性
-            weight = data.get("weight", 1.0)
-
-            nodes_data.append(
-                {
-                    "concept": concept,
-                    "memory_items": memory_items,
-                    "weight": weight,
-                    "hash": memory_hash,
-                    "created_time": created_time,
-                    "last_modified": last_modified,
-                }
-            )
+            nodes_data[concept] = {
+                "concept": concept,
+                "memory_items": memory_items,
+                "weight": data.get("weight", 1.0),
+                "hash": self._node_hash(concept, data),
+                "created_time": data.get("created_time", current_time),
+                "last_modified": data.get("last_modified", current_time),
+            }
 
-        # 批量插入节点
-        if nodes_data:
-            batch_size = 100
-            for i in range(0, len(nodes_data), batch_size):
-                batch = nodes_data[i : i + batch_size]
-                GraphNodes.insert_many(batch).execute()
+        # 与数据库现有记录比较，只写入新增或内容有变化的节点（旧格式的特征值也会被一并更新）
+        db_nodes = {
+            concept: (memory_items, weight, node_hash, created_time, last_modified)
+            for concept, memory_items, weight, node_hash, created_time, last_modified in GraphNodes.select(
+                GraphNodes.concept,
+                GraphNodes.memory_items,
+                GraphNodes.weight,
+                GraphNodes.hash,
+                GraphNodes.created_time,
+                GraphNodes.last_modified,
+            ).tuples()
+        }
+        nodes_to_upsert = [
+            row
+            for concept, row in nodes_data.items()
+            if db_nodes.get(concept)
+            != (row["memory_items"], row["weight"], row["hash"], row["created_time"], row["last_modified"])
+        ]
+        nodes_to_delete = [concept for concept in db_nodes if concept not in nodes_data]
 
-        # 批量准备边数据
-        edges_data = []
-        for source, target, data in memory_edges:
+        # 批量准备边数据（在节点处理之后获取，不包含随空节点一起移除的边）
+        edges_data = {}
+        for source, target, data in graph.G.edges(data=True):
             try:
-                edges_data.append(
-                    {
-                        "source": source,
-                        "target": target,
-                        "strength": data.get("strength", 1),
-                        "hash": self.hippocampus.calculate_edge_hash(source, target),
-                        "created_time": data.get("created_time", current_time),
-                        "last_modified": data.get("last_modified", current_time),
-                    }
-                )
+                edges_data[graph.edge_key(source, target)] = {
+                    "source": source,
+                    "target": target,
+                    "strength": data.get("strength", 1),
+                    "hash": self.hippocampus.calculate_edge_hash(source, target),
+                    "created_time": data.get("created_time", current_time),
+                    "last_modified": data.get("last_modified", current_time),
+                }
             except Exception as e:
                 logger.error(f"准备边 {source}-{target} 数据时发生错误: {e}")
                 continue
 
-        # 批量插入边
-        if edges_data:
-            batch_size = 100
-            for i in range(0, len(edges_data), batch_size):
-                batch = edges_data[i : i + batch_size]
-                GraphEdges.insert_many(batch).execute()
+        # 边没有唯一约束，无法使用UPSERT：按节点对与数据库记录比较，每对节点保留一行，多余的重复行删除
+        edges_to_update = []
+        edge_ids_to_delete = []
+        matched_edge_keys = set()
+        for db_edge in GraphEdges.select(
+            GraphEdges.id,
+            GraphEdges.source,
+            GraphEdges.target,
+            GraphEdges.strength,
+            GraphEdges.created_time,
+            GraphEdges.last_modified,
+        ):
+            key = graph.edge_key(db_edge.source, db_edge.target)
+            row = edges_data.get(key)
+            if row is None or key in matched_edge_keys:
+                edge_ids_to_delete.append(db_edge.id)
+                continue
+            matched_edge_keys.add(key)
+            if (db_edge.strength, db_edge.created_time, db_edge.last_modified) != (
+                row["strength"],
+                row["created_time"],
+                row["last_modified"],
+            ):
+                db_edge.strength = row["strength"]
+                db_edge.created_time = row["created_time"]
+                db_edge.last_modified = row["last_modified"]
+                edges_to_update.append(db_edge)
+        edges_to_create = [row for key, row in edges_data.items() if key not in matched_edge_keys]
+
+        # 在单个事务中批量写入
+        with db.atomic():
+            for i in range(0, len(nodes_to_upsert), batch_size):
+                GraphNodes.insert_many(nodes_to_upsert[i : i + batch_size]).on_conflict(
+                    conflict_target=[GraphNodes.concept],
+                    preserve=[
+                        GraphNodes.memory_items,
+                        GraphNodes.weight,
+                        GraphNodes.hash,
+                        GraphNodes.created_time,
+                        GraphNodes.last_modified,
+                    ],
+                ).execute()
+
+            for i in range(0, len(nodes_to_delete), batch_size):
+                GraphNodes.delete().where(GraphNodes.concept.in_(nodes_to_delete[i : i + batch_size])).execute()  # type: ignore
+
+            for i in range(0, len(edges_to_create), batch_size):
+                GraphEdges.insert_many(edges_to_create[i : i + batch_size]).execute()
+
+            if edges_to_update:
+                GraphEdges.bulk_update(
+                    edges_to_update,
+                    fields=[GraphEdges.strength, GraphEdges.created_time, GraphEdges.last_modified],
+                    batch_size=batch_size,
+                )
+
+            for i in range(0, len(edge_ids_to_delete), batch_size):
+                GraphEdges.delete().where(GraphEdges.id.in_(edge_ids_to_delete[i : i + batch_size])).execute()  # type: ignore
+
+        # 数据库已与内存中的图完全一致
+        graph.clear_changes()
 
         end_time = time.time()
         logger.info(f"[数据库] 重新同步完成，总耗时: {end_time - start_time:.2f}秒")
-        logger.info(f"[数据库] 同步了 {len(nodes_data)} 个节点和 {len(edges_data)} 条边")
+        logger.info(
+            f"[数据库] 写入了 {len(nodes_to_upsert)} 个节点和 {len(edges_to_create) + len(edges_to_update)} 条边，"
+            f"删除了 {len(nodes_to_delete)} 个节点和 {len(edge_ids_to_delete)} 条边"
+        )
 
     def sync_memory_from_db(self):
         """从数据库同步数据到内存中的图结构"""
-        current_time = datetime.datetime.now().timestamp()
+        current_time = time.time()
         need_update = False
 
         # 清空当前图
         self.memory_graph.G.clear()
+        self.memory_graph.invalidate_cache()
+        # 图与数据库重新一致，此后只需记录未能加载的无效记录，在下次同步时从数据库删除
+        self.memory_graph.clear_changes()
+        # 图重建后旧节点名称不再出现，释放分词缓存
+        get_word_set.cache_clear()
         
         # 统计加载情况
         total_nodes = 0
@@ -975,6 +1173,7 @@ class EntorhinalCortex:
                 # 处理空字符串或None的情况
                 if not node.memory_items or node.memory_items.strip() == "":
                     logger.warning(f"节点 {concept} 的memory_items为空，跳过")
+                    self.memory_graph.removed_nodes.add(concept)
                     skipped_nodes += 1
                     continue
                 
@@ -1007,6 +1206,7 @@ class EntorhinalCortex:
                 loaded_nodes += 1
             except Exception as e:
                 logger.error(f"加载节点 {concept} 时发生错误: {e}")
+                self.memory_graph.removed_nodes.add(concept)
                 skipped_nodes += 1
                 continue
 
@@ -1040,6 +1240,9 @@ class EntorhinalCortex:
                 self.memory_graph.G.add_edge(
                     source, target, strength=strength, created_time=created_time, last_modified=last_modified
                 )
+            else:
+                self.memory_graph.removed_edges.add(self.memory_graph.edge_key(source, target))
+        self.memory_graph.invalidate_cache()
 
         if need_update:
             logger.info("[数据库] 已为缺失的时间字段进行补充")
@@ -1104,16 +1307,12 @@ class ParahippocampalGyrus:
         )
 
         # 提取<>中的内容
-        topics = re.findall(r"<([^>]+)>", topics_response)
+        topics = _TOPIC_RE.findall(topics_response)
 
         if not topics:
             topics = ["none"]
         else:
-            topics = [
-                topic.strip()
-                for topic in ",".join(topics).replace("，", ",").replace("、", ",").replace(" ", ",").split(",")
-                if topic.strip()
-            ]
+            topics = [topic.strip() for topic in _TOPIC_SEP_RE.split(",".join(topics)) if topic.strip()]
 
         # 3. 过滤掉包含禁用关键词的topic
         filtered_topics = [
@@ -1134,34 +1333,26 @@ class ParahippocampalGyrus:
                 logger.error(f"生成话题 '{topic}' 的摘要时发生错误: {e}")
                 continue
 
-        # 等待所有任务完成
+        # 并发等待所有任务完成
         compressed_memory: Set[Tuple[str, str]] = set()
         similar_topics_dict = {}
 
-        for topic, task in tasks:
-            response = await task
+        responses = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+
+        for (topic, _), response in zip(tasks, responses, strict=True):
+            if isinstance(response, BaseException):
+                logger.error(f"生成话题 '{topic}' 的摘要时发生错误: {response}")
+                continue
             if response:
                 compressed_memory.add((topic, response[0]))
 
-                existing_topics = list(self.memory_graph.G.nodes())
-                similar_topics = []
-
-                for existing_topic in existing_topics:
-                    topic_words = set(jieba.cut(topic))
-                    existing_words = set(jieba.cut(existing_topic))
-
-                    all_words = topic_words | existing_words
-                    v1 = [1 if word in topic_words else 0 for word in all_words]
-                    v2 = [1 if word in existing_words else 0 for word in all_words]
-
-                    similarity = cosine_similarity(v1, v2)
-
-                    if similarity >= 0.7:
-                        similar_topics.append((existing_topic, similarity))
-
-                similar_topics.sort(key=lambda x: x[1], reverse=True)
-                similar_topics = similar_topics[:3]
-                similar_topics_dict[topic] = similar_topics
+                # 通过分词倒排索引只计算与主题共享分词的现有主题，取相似度不低于0.7的前3个
+                existing_topics, similarities = self.hippocampus.word_set_similarities(get_word_set(topic))
+                candidates = np.flatnonzero(similarities >= 0.7)
+                similar_topics_dict[topic] = [
+                    (existing_topics[idx], float(similarities[idx]))
+                    for idx in candidates[_top_k_indices(similarities[candidates], 3)]
+                ]
                 
         if global_config.debug.show_prompt:
             logger.info(f"prompt: {topic_what_prompt}")
@@ -1179,22 +1370,23 @@ class ParahippocampalGyrus:
             logger.warning(f"[遗忘] 无效的遗忘百分比: {percentage}, 使用默认值 0.005")
             percentage = 0.005
 
+        # 边通过 sample_edges 抽样（CSR快照有效时无需展开全部边）
         all_nodes = list(self.memory_graph.G.nodes())
-        all_edges = list(self.memory_graph.G.edges())
+        edge_count = self.memory_graph.G.number_of_edges()
 
-        if not all_nodes and not all_edges:
+        if not all_nodes and not edge_count:
             logger.info("[遗忘] 记忆图为空,无需进行遗忘操作")
             return
 
         # 确保至少检查1个节点和边，且不超过总数
         check_nodes_count = max(1, min(len(all_nodes), int(len(all_nodes) * percentage)))
-        check_edges_count = max(1, min(len(all_edges), int(len(all_edges) * percentage)))
+        check_edges_count = max(1, min(edge_count, int(edge_count * percentage)))
 
         # 只有在有足够的节点和边时才进行采样
-        if len(all_nodes) >= check_nodes_count and len(all_edges) >= check_edges_count:
+        if len(all_nodes) >= check_nodes_count and edge_count >= check_edges_count:
             try:
                 nodes_to_check = random.sample(all_nodes, check_nodes_count)
-                edges_to_check = random.sample(all_edges, check_edges_count)
+                edges_to_check = self.memory_graph.sample_edges(check_edges_count)
             except ValueError as e:
                 logger.error(f"[遗忘] 采样错误: {str(e)}")
                 return
@@ -1212,23 +1404,26 @@ class ParahippocampalGyrus:
             "removed": [],  # 存储移除的节点
         }
 
-        current_time = datetime.datetime.now().timestamp()
+        current_time = time.time()
+        # 循环内不变的量提前绑定为局部变量
+        G = self.memory_graph.G
+        time_threshold = 3600 * global_config.memory.memory_forget_time
 
         logger.info("[遗忘] 开始检查连接...")
         edge_check_start = time.time()
         for source, target in edges_to_check:
-            edge_data = self.memory_graph.G[source][target]
+            edge_data = G[source][target]
             last_modified = edge_data.get("last_modified")
 
-            if current_time - last_modified > 3600 * global_config.memory.memory_forget_time:
+            if current_time - last_modified > time_threshold:
                 current_strength = edge_data.get("strength", 1)
                 new_strength = current_strength - 1
 
                 if new_strength <= 0:
-                    self.memory_graph.G.remove_edge(source, target)
+                    self.memory_graph.remove_edge(source, target)
                     edge_changes["removed"].append(f"{source} -> {target}")
                 else:
-                    edge_data["strength"] = new_strength
+                    self.memory_graph.set_edge_strength(source, target, new_strength)
                     edge_data["last_modified"] = current_time
                     edge_changes["weakened"].append(f"{source}-{target} (强度: {current_strength} -> {new_strength})")
         edge_check_end = time.time()
@@ -1238,17 +1433,17 @@ class ParahippocampalGyrus:
         node_check_start = time.time()
         for node in nodes_to_check:
             # 检查节点是否存在，以防在迭代中被移除（例如边移除导致）
-            if node not in self.memory_graph.G:
+            if node not in G:
                 continue
 
-            node_data = self.memory_graph.G.nodes[node]
+            node_data = G.nodes[node]
 
             # 首先获取记忆项
             memory_items = node_data.get("memory_items", "")
             # 直接检查记忆内容是否为空
             if not memory_items or memory_items.strip() == "":
                 try:
-                    self.memory_graph.G.remove_node(node)
+                    self.memory_graph.remove_node(node)
                     node_changes["removed"].append(f"{node}(空节点)")  # 标记为空节点移除
                     logger.debug(f"[遗忘] 移除了空的节点: {node}")
                 except nx.NetworkXError as e:
@@ -1258,10 +1453,9 @@ class ParahippocampalGyrus:
             # --- 如果节点不为空，则执行原来的不活跃检查和随机移除逻辑 ---
             last_modified = node_data.get("last_modified", current_time)
             node_weight = node_data.get("weight", 1.0)
-            
-            # 条件1：检查是否长时间未修改 (使用配置的遗忘时间)
-            time_threshold = 3600 * global_config.memory.memory_forget_time
-            
+
+            # 条件1：检查是否长时间未修改 (使用配置的遗忘时间，time_threshold 已在循环外计算)
+
             # 基于权重调整遗忘阈值：权重越高，需要更长时间才能被遗忘
             # 权重为1时使用默认阈值，权重越高阈值越大（越难遗忘）
             adjusted_threshold = time_threshold * node_weight
@@ -1269,7 +1463,7 @@ class ParahippocampalGyrus:
             if current_time - last_modified > adjusted_threshold and memory_items:
                 # 既然每个节点现在是完整记忆，直接删除整个节点
                 try:
-                    self.memory_graph.G.remove_node(node)
+                    self.memory_graph.remove_node(node)
                     node_changes["removed"].append(f"{node}(长时间未修改,权重{node_weight:.1f})")
                     logger.debug(f"[遗忘] 移除了长时间未修改的节点: {node} (权重: {node_weight:.1f})")
                 except nx.NetworkXError as e:
@@ -1281,7 +1475,8 @@ class ParahippocampalGyrus:
         if any(edge_changes.values()) or any(node_changes.values()):
             sync_start = time.time()
 
-            await self.hippocampus.entorhinal_cortex.resync_memory_to_db()
+            # 遗忘过程中的删除与修改已记录在记忆图的变更集合中，只需增量同步
+            await self.hippocampus.entorhinal_cortex.sync_memory_to_db()
 
             sync_end = time.time()
             logger.info(f"[遗忘] 数据库同步耗时: {sync_end - sync_start:.2f}秒")
@@ -1389,7 +1584,7 @@ class HippocampusManager:
                             for similar_topic, similarity in similar_topics:
                                 if topic != similar_topic:
                                     strength = int(similarity * 10)
-                                    self._hippocampus.memory_graph.G.add_edge(
+                                    self._hippocampus.memory_graph.add_edge(
                                         topic, similar_topic, 
                                         strength=strength,
                                         created_time=current_time,
@@ -1472,17 +1667,17 @@ class MemoryBuilder:
         if time_diff < 600 /global_config.memory.memory_build_frequency:
             return False
             
-        # 检查消息数量
-        
-        recent_messages = get_raw_msg_by_timestamp_with_chat_inclusive(
-            chat_id=self.chat_id,
-            timestamp_start=self.last_update_time,
-            timestamp_end=current_time,
+        # 检查消息数量（只需计数，由数据库执行COUNT，无需取出并转换全部消息）
+        recent_message_count = count_messages(
+            message_filter={
+                "chat_id": self.chat_id,
+                "time": {"$gte": self.last_update_time, "$lte": current_time},
+            }
         )
         
-        logger.info(f"最近消息数量: {len(recent_messages)}，间隔时间: {time_diff}")
+        logger.info(f"最近消息数量: {recent_message_count}，间隔时间: {time_diff}")
         
-        if not recent_messages or len(recent_messages) < 30/global_config.memory.memory_build_frequency :
+        if not recent_message_count or recent_message_count < 30/global_config.memory.memory_build_frequency :
             return False
             
         return True
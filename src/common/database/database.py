@@ -77,6 +77,8 @@ db = SqliteDatabase(
         "foreign_keys": 1,
         "ignore_check_constraints": 0,
         "synchronous": 0,  # 异步写入提高性能
+        "temp_store": 2,  # 临时表与排序使用内存
+        "mmap_size": 256 * 1024 * 1024,  # 256MB内存映射读取
         "busy_timeout": 1000,  # 1秒超时而不是3秒
     },
 )
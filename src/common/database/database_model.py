@@ -367,6 +367,9 @@ class GraphEdges(BaseModel):
 
     class Meta:
         table_name = "graph_edges"
+        # (源节点, 目标节点) 联合索引，用于按节点对更新/删除边
+        # 不设为唯一索引：历史数据中同一对节点可能存在重复记录，且无向边可能以任一方向存储
+        indexes = ((("source", "target"), False),)
 
 
 def create_tables():
@@ -469,6 +472,12 @@ def initialize_database(sync_constraints=False):
                         except Exception as e:
                             logger.error(f"添加字段 '{field_name}' 失败: {e}")
 
+                # 补充创建模型中定义但数据库中缺失的索引（如后续新增的联合索引）
+                try:
+                    model._schema.create_indexes(safe=True)
+                except Exception as e:
+                    logger.error(f"为表 '{table_name}' 创建索引失败: {e}")
+
                 # 检查并删除多余字段（新增逻辑）
                 extra_fields = existing_columns - model_fields
                 if extra_fields:
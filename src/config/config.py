@@ -1,11 +1,12 @@
 import os
+import tomli
 import tomlkit
 import shutil
 import sys
 
 from datetime import datetime
 from tomlkit import TOMLDocument
-from tomlkit.items import Table, KeyType
+from tomlkit.items import Item, Table, KeyType
 from dataclasses import field, dataclass
 from rich.traceback import install
 from typing import List, Optional
@@ -74,28 +75,49 @@ def get_key_comment(toml_table, key):
     return None
 
 
+def _flatten_paths(d, prefix=(), paths=None):
+    # 一次遍历展开为 {路径元组: (父容器, 键, 是否为表)}，保持原有遍历顺序
+    if paths is None:
+        paths = {}
+    for key, value in d.items():
+        if key == "version":
+            continue
+        path = prefix + (str(key),)
+        is_table = isinstance(value, (dict, Table))
+        paths[path] = (d, key, is_table)
+        if is_table:
+            _flatten_paths(value, path, paths)
+    return paths
+
+
+def _diff_paths(src_paths, other_paths, depth=0):
+    # 只报告最外层差异：父路径在另一侧同样是表时才算新增/删减，子项不重复报告
+    for path, (parent, key, _) in src_paths.items():
+        if path in other_paths:
+            continue
+        parent_path = path[:-1]
+        if len(parent_path) > depth and not (parent_path in other_paths and other_paths[parent_path][2]):
+            continue
+        yield path, parent, key
+
+
 def compare_dicts(new, old, path=None, logs=None):
-    # 递归比较两个dict，找出新增和删减项，收集注释
+    # 展开两棵树后做路径集合差，找出新增和删减项，收集注释
     if path is None:
         path = []
     if logs is None:
         logs = []
+    prefix = tuple(str(p) for p in path)
+    new_paths = _flatten_paths(new, prefix)
+    old_paths = _flatten_paths(old, prefix)
     # 新增项
-    for key in new:
-        if key == "version":
-            continue
-        if key not in old:
-            comment = get_key_comment(new, key)
-            logs.append(f"新增: {'.'.join(path + [str(key)])}  注释: {comment or '无'}")
-        elif isinstance(new[key], (dict, Table)) and isinstance(old.get(key), (dict, Table)):
-            compare_dicts(new[key], old[key], path + [str(key)], logs)
+    for key_path, parent, key in _diff_paths(new_paths, old_paths, len(prefix)):
+        comment = get_key_comment(parent, key)
+        logs.append(f"新增: {'.'.join(key_path)}  注释: {comment or '无'}")
     # 删减项
-    for key in old:
-        if key == "version":
-            continue
-        if key not in new:
-            comment = get_key_comment(old, key)
-            logs.append(f"删减: {'.'.join(path + [str(key)])}  注释: {comment or '无'}")
+    for key_path, parent, key in _diff_paths(old_paths, new_paths, len(prefix)):
+        comment = get_key_comment(parent, key)
+        logs.append(f"删减: {'.'.join(key_path)}  注释: {comment or '无'}")
     return logs
 
 
@@ -147,8 +169,9 @@ def _get_version_from_toml(toml_path) -> Optional[str]:
     """从TOML文件中获取版本号"""
     if not os.path.exists(toml_path):
         return None
-    with open(toml_path, "r", encoding="utf-8") as f:
-        doc = tomlkit.load(f)
+    # 只读取版本号，无需保留格式，使用tomli快速解析
+    with open(toml_path, "rb") as f:
+        doc = tomli.load(f)
     if "inner" in doc and "version" in doc["inner"]:  # type: ignore
         return doc["inner"]["version"]  # type: ignore
     return None
@@ -175,13 +198,9 @@ def _update_dict(target: TOMLDocument | dict | Table, source: TOMLDocument | dic
                 _update_dict(target_value, value)
             else:
                 try:
-                    # 对数组类型进行特殊处理
-                    if isinstance(value, list):
-                        # 如果是空数组，确保它保持为空数组
-                        target[key] = tomlkit.array(str(value)) if value else tomlkit.array()
-                    else:
-                        # 其他类型使用item方法创建新值
-                        target[key] = tomlkit.item(value)
+                    # 旧配置中的值本身就是tomlkit对象（数组也会保留原有格式），直接赋值，
+                    # 避免转成字符串再交给tomlkit重新解析；普通Python值才用item包装
+                    target[key] = value if isinstance(value, Item) else tomlkit.item(value)
                 except (TypeError, ValueError):
                     # 如果转换失败，直接赋值
                     target[key] = value
@@ -223,11 +242,13 @@ def _update_config_generic(config_name: str, template_name: str):
     compare_config = None
     new_config = None
     old_config = None
+    config_updated = False
 
     # 先读取 compare 下的模板（如果有），用于默认值变动检测
+    # 该模板只参与值比较、不会回写，使用tomli解析为普通dict即可
     if os.path.exists(compare_path):
-        with open(compare_path, "r", encoding="utf-8") as f:
-            compare_config = tomlkit.load(f)
+        with open(compare_path, "rb") as f:
+            compare_config = tomli.load(f)
 
     # 读取当前模板
     with open(template_path, "r", encoding="utf-8") as f:
@@ -244,7 +265,6 @@ def _update_config_generic(config_name: str, template_name: str):
             for log in logs:
                 logger.info(log)
             # 检查旧配置是否等于旧默认值，如果是则更新为新默认值
-            config_updated = False
             for path, old_default, new_default in changes:
                 old_value = get_value_by_path(old_config, path)
                 if old_value == old_default:
@@ -253,12 +273,6 @@ def _update_config_generic(config_name: str, template_name: str):
                         f"已自动将{config_name}配置 {'.'.join(path)} 的值从旧默认值 {old_default} 更新为新默认值 {new_default}"
                     )
                     config_updated = True
-            
-            # 如果配置有更新，立即保存到文件
-            if config_updated:
-                with open(old_config_path, "w", encoding="utf-8") as f:
-                    f.write(tomlkit.dumps(old_config))
-                logger.info(f"已保存更新后的{config_name}配置文件")
         else:
             logger.info(f"未检测到{config_name}模板默认值变动")
 
@@ -284,6 +298,11 @@ def _update_config_generic(config_name: str, template_name: str):
         new_version = new_config["inner"].get("version")  # type: ignore
         if old_version and new_version and old_version == new_version:
             logger.info(f"检测到{config_name}配置文件版本号相同 (v{old_version})，跳过更新")
+            # 版本相同时不会重新生成配置，默认值变动需在此单独保存
+            if config_updated:
+                with open(old_config_path, "w", encoding="utf-8") as f:
+                    f.write(tomlkit.dumps(old_config))
+                logger.info(f"已保存更新后的{config_name}配置文件")
             return
         else:
             logger.info(
@@ -301,10 +320,6 @@ def _update_config_generic(config_name: str, template_name: str):
     shutil.move(old_config_path, old_backup_path)
     logger.info(f"已备份旧{config_name}配置文件到: {old_backup_path}")
 
-    # 复制模板文件到配置目录
-    shutil.copy2(template_path, new_config_path)
-    logger.info(f"已创建新{config_name}配置文件: {new_config_path}")
-
     # 输出新增和删减项及注释
     if old_config:
         logger.info(f"{config_name}配置项变动如下：\n----------------------------------------")
@@ -318,9 +333,11 @@ def _update_config_generic(config_name: str, template_name: str):
     logger.info(f"开始合并{config_name}新旧配置...")
     _update_dict(new_config, old_config)
 
-    # 保存更新后的配置（保留注释和格式）
+    # 以模板为基础直接写出合并后的配置（保留注释和格式），无需先复制模板再覆盖
+    # 默认值变动已应用在old_config上，会随合并一并写入；备份保留用户原始文件
     with open(new_config_path, "w", encoding="utf-8") as f:
         f.write(tomlkit.dumps(new_config))
+    logger.info(f"已创建新{config_name}配置文件: {new_config_path}")
     logger.info(f"{config_name}配置文件更新完成，建议检查新配置文件中的内容，以免丢失重要信息")
 
 